@@ -6,8 +6,10 @@
 # Contact: andrewbadr@gmail.com
 # Code contributions are welcome.
 
+from array import array
 from copy import copy
 from UnionFind import UnionFind
+import hopcroft
 
 # TODO: general code cleanup
 # TODO: write tests
@@ -170,14 +172,31 @@ class DFA:
         """Deletes all the unreachable states."""
         reachable = self.reachable()
         self.states = reachable
+        reached = set(reachable)
         new_accepts = []
         for q in self.accepts:
-            if q in self.states:
+            if q in reached:
                 new_accepts.append(q)
         self.accepts = new_accepts
 
     def mn_classes(self):
-        """Returns a partition of self.states into Myhill-Nerode equivalence classes."""
+        """Returns a partition of self.states into Myhill-Nerode equivalence classes,
+        using Hopcroft's O(n log n) partition refinement (see hopcroft.py).
+        """
+        states = list(self.states)
+        alphabet = list(self.alphabet)
+        number = dict((q, i) for i, q in enumerate(states))
+        moves = array('i', [number[self.delta(q, c)]
+                            for q in states for c in alphabet])
+        accepts = set(self.accepts)
+        blocks = [[i for i, q in enumerate(states) if q in accepts],
+                  [i for i, q in enumerate(states) if q not in accepts]]
+        classes = hopcroft.refine(len(states), len(alphabet), moves, blocks)
+        return [[states[i] for i in cl] for cl in classes]
+
+    def mn_classes_quadratic(self):
+        """Returns a partition of self.states into Myhill-Nerode equivalence classes,
+        by the simple O(n^2) algorithm (kept for reference and benchmarking)."""
         changed = True
         classes = []
         if self.accepts != []:
@@ -236,8 +255,9 @@ class DFA:
                 if state == self.current_state:
                     new_current_state = representative
         #build new_accepts:
+        representatives = set(new_states)
         for acc in self.accepts:
-            if acc in new_states:
+            if acc in representatives:
                 new_accepts.append(acc)
         #build new_delta:
         transitions = {}
@@ -254,7 +274,7 @@ class DFA:
         return state_map
 
     def minimize(self):
-        """Classical DFA minimization, using the simple O(n^2) algorithm.
+        """Classical DFA minimization, using Hopcroft's O(n log n) algorithm.
         Side effect: can mix up the internal ordering of states.
         """
         #Step 1: Delete unreachable states
@@ -0,0 +1,33 @@
+"""
+Time DFA minimization on random DFAs of growing size: Hopcroft's
+partition refinement against the old quadratic mn_classes.
+Usage: python bench_minimize.py [max_states] [alphabet_size]
+"""
+
+import sys, time
+
+import DFA
+
+def timing(f):
+    start = time.time()
+    result = f()
+    return time.time() - start, result
+
+def main(argv):
+    max_states = int(argv[1]) if 1 < len(argv) else 100000
+    k = int(argv[2]) if 2 < len(argv) else 4
+    print '%8s %8s %12s %12s' % ('states', 'classes', 'hopcroft s', 'quadratic s')
+    n = 100
+    while n <= max_states:
+        dfa = DFA.random(n, k)
+        dfa.delete_unreachable()
+        fast, classes = timing(dfa.mn_classes)
+        if n <= 1000:
+            slow = '%12.3f' % timing(dfa.mn_classes_quadratic)[0]
+        else:
+            slow = '%12s' % '-'    # (Too slow to wait for.)
+        print '%8d %8d %12.3f %s' % (len(dfa.states), len(classes), fast, slow)
+        n *= 10
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,43 @@
+"""
+Compare lex.py's dict-walking scanner with the packed-array one.
+Usage: python bench_scan.py [filename]
+Without a filename, scan some made-up input (lex.py's toy token set
+only knows C keywords and whitespace, so it'd stop early on real C).
+"""
+
+import random, sys, time
+
+import lex
+
+def dict_scan(s):
+    tokens = []
+    while True:
+        label, token, rest = lex.scan1(s)
+        if label is None: break
+        tokens.append((label, token))
+        s = rest
+    return tokens
+
+def packed_scan(s):
+    return lex.packed.scan(s)[0]
+
+def make_input(ntokens):
+    words = lex.re_strings
+    return ''.join(random.choice(words) + random.choice(' \t  ')
+                   for _ in range(ntokens))
+
+def timing(f, s):
+    start = time.time()
+    ntokens = len(f(s))
+    return ntokens, time.time() - start
+
+def main(argv):
+    s = open(argv[1]).read() if 1 < len(argv) else make_input(20000)
+    print '%d bytes' % len(s)
+    for f in dict_scan, packed_scan:
+        ntokens, secs = timing(f, s)
+        print '%-12s %7d tokens %7.3f sec %10.0f bytes/sec' % (
+            f.__name__, ntokens, secs, len(s) / secs)
+
+if __name__ == '__main__':
+    main(sys.argv)
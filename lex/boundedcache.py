@@ -0,0 +1,135 @@
+"""
+A size-bounded memo table, meant to be shared by many regexes for
+their derivatives, with clock (second-chance) eviction. Each regex
+Maker gets its own share of the cache, so when you're done with a
+compiled regex you can release its entries all at once.
+"""
+
+import sys
+
+class BoundedCache:
+
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.entries = {}       # key -> [value, owner, referenced]
+        self.ring = []          # The keys in clock order (some maybe stale,
+                                # but most not)
+        self.hand = 0
+        self.owned = {}         # owner -> set of its keys
+        self.hits = self.misses = self.evictions = 0
+
+    def share(self): return Share(self)
+
+    def enter(self, owner, key, make):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            entry[2] = True
+            return entry[0]
+        self.misses += 1
+        value = make()
+        if key not in self.entries: # (make() might have entered it)
+            while self.entries and self.capacity <= len(self.entries):
+                self.evict()
+            self.entries[key] = [value, owner, False]
+            self.ring.append(key)
+            self.owned.setdefault(owner, set()).add(key)
+        return value
+
+    def evict(self):
+        ring, entries = self.ring, self.entries
+        while True:
+            if len(ring) <= self.hand:
+                self.compact()
+            key = ring[self.hand]
+            self.hand += 1
+            entry = entries.get(key)
+            if entry is None:
+                continue        # (A stale key, from release())
+            if entry[2]:
+                entry[2] = False
+            else:
+                del entries[key]
+                keys = self.owned[entry[1]]
+                keys.discard(key)
+                if not keys: del self.owned[entry[1]]
+                self.evictions += 1
+                self.check_stale()
+                return
+
+    def release(self, owner):
+        "Drop all of owner's entries."
+        for key in self.owned.pop(owner, ()):
+            del self.entries[key]
+        self.check_stale()
+
+    def check_stale(self):
+        if 2 * len(self.entries) < len(self.ring):
+            self.compact()      # (Stale keys outnumber live ones.)
+
+    def compact(self):
+        """Drop the stale keys from the ring, and repeats of a key
+        (released and entered again), starting it at the hand."""
+        ring, entries, seen = self.ring, self.entries, set()
+        ring[:] = ring[self.hand:] + ring[:self.hand]
+        self.hand = 0
+        live = []
+        for key in ring:
+            if key in entries and key not in seen:
+                seen.add(key)
+                live.append(key)
+        ring[:] = live
+
+    def set_capacity(self, capacity):
+        self.capacity = capacity
+        while self.entries and capacity < len(self.entries):
+            self.evict()
+
+    def stats(self):
+        return dict(size=len(self.entries), capacity=self.capacity,
+                    hits=self.hits, misses=self.misses,
+                    evictions=self.evictions, owners=len(self.owned),
+                    bytes=self.footprint())
+
+    def footprint(self):
+        "Roughly how many bytes the cache's own structures take."
+        entry_size = sys.getsizeof([None, None, False])
+        stale = len(self.ring) - len(self.entries)  # (Roughly)
+        return (sys.getsizeof(self.entries) + sys.getsizeof(self.ring)
+                + len(self.entries) * entry_size
+                + stale * sys.getsizeof((None, None)))
+
+class Share:
+    "One owner's view of a BoundedCache."
+    def __init__(self, cache):
+        self.cache = cache
+    def enter(self, key, make):
+        return self.cache.enter(self, key, make)
+    def release(self):
+        self.cache.release(self)
+    def size(self):
+        return len(self.cache.owned.get(self, ()))
+
+## cache = BoundedCache(3)
+## a, b = cache.share(), cache.share()
+## [a.enter(k, lambda: k*2) for k in 'xyx']
+#. ['xx', 'yy', 'xx']
+## b.enter('z', lambda: 'zz'), a.size(), b.size()
+#. ('zz', 2, 1)
+## b.enter('w', lambda: 'ww')
+#. 'ww'
+## sorted(cache.entries), cache.evictions
+#. (['w', 'x', 'z'], 1)
+## a.release()
+## sorted(cache.entries), a.size()
+#. (['w', 'z'], 0)
+## cache.set_capacity(1)
+## sorted(cache.entries)
+#. ['w']
+
+# (Releasing doesn't leave the ring to grow, holding on to released keys:)
+## cache = BoundedCache(1000)
+## shares = [cache.share() for _ in range(1000)]
+## for i, share in enumerate(shares): [share.enter((i, j), lambda: j) for j in range(10)]; share.release()
+## len(cache.entries), len(cache.ring)
+#. (0, 0)
@@ -0,0 +1,46 @@
+"""
+Alphabet compression: split the 256 byte values into the fewest
+classes that no regex in a set can tell apart. Then a DFA only needs
+one move per class, and building it only needs to look at one
+representative byte per class.
+"""
+
+from parse import make_parser
+
+def byte_classes(charsets):
+    """Return (table, reps) for a collection of sets of characters,
+    where two bytes are in the same class iff they're in exactly the
+    same sets. table is a 256-char string for str.translate() mapping
+    each byte to its class's representative (the least byte in the
+    class); reps lists the representatives in order."""
+    signatures = [[] for b in range(256)]
+    for i, charset in enumerate(set(map(frozenset, charsets))):
+        for c in charset:
+            signatures[ord(c)].append(i)
+    rep_of = {}
+    table = ''.join(rep_of.setdefault(tuple(signature), chr(b))
+                    for b, signature in enumerate(signatures))
+    return table, sorted(rep_of.values())
+
+def charsets(re_strings):
+    "Return the sets of characters the regexes in re_strings test for."
+    parse = make_parser(CharsetMaker())
+    return [charset for s in re_strings for charset in parse(s)]
+
+class CharsetMaker:
+    "Make a 'regex' that's just the list of charsets it tests for."
+    empty = ()
+    def lit(self, c): return (frozenset(c),)
+    def alt(self, t1, t2): return t1 + t2
+    def seq(self, t1, t2): return t1 + t2
+    def many(self, t): return t
+
+## table, reps = byte_classes(charsets(['if', 'int', '( |\t)*']))
+## reps
+#. ['\x00', '\t', ' ', 'f', 'i', 'n', 't']
+## 'if x int'.translate(table)
+#. 'if \x00 int'
+## len(byte_classes([])[1])
+#. 1
+## byte_classes([set('abc'), set('bcd')])[1]
+#. ['\x00', 'a', 'b', 'd']
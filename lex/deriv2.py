@@ -3,9 +3,14 @@ Regular expression matching, and incremental DFA construction, using
 even-more-simplified and memoized Brzozowski derivatives.
 
 Rather less clunky, but also less Pythonic, than deriv.py.
+
+By default the derivatives and hash-consing tables grow forever. Give
+a Maker a boundedcache.BoundedCache to keep its derivatives in that
+(shared, bounded) cache instead, with weak hash-consing tables, and
+call Maker.release() when you're done with its regexes.
 """
 
-from memo import memoize
+from memo import memoize, weak_memoize
 
 def match(re, s):
     for c in s:
@@ -14,11 +19,11 @@ def match(re, s):
         if re is fail: return False
     return re.nullable
 
-def mark(nullable, deriv, tag, args):
+def mark(nullable, deriv, tag, args, memo=memoize):
     deriv.nullable = nullable
     deriv.tag = tag
     deriv.args = args
-    deriv.deriv = memoize(deriv)
+    deriv.deriv = memo(deriv)
     return deriv
 
 fail = mark(False, lambda c: fail, 'fail', ())
@@ -30,12 +35,25 @@ def _lit(literal): return mark(False,
 
 class Maker:
 
-    def __init__(self):
+    def __init__(self, cache=None):
+        "cache: a BoundedCache to share, or None to memoize without bound."
+        self.cache = cache and cache.share()
+        self.memo = memoize if cache is None else self.cached
+        hashcons = memoize if cache is None else weak_memoize
         self.empty  = empty
-        self.lit    = memoize(_lit)
-        self.mkalt  = memoize(self._alt)
-        self.mkseq  = memoize(self._seq)
-        self.mkmany = memoize(self._many)
+        self.lit    = hashcons(_lit)
+        self.mkalt  = hashcons(self._alt)
+        self.mkseq  = hashcons(self._seq)
+        self.mkmany = hashcons(self._many)
+        self.mkrepeat = hashcons(self._repeat)
+
+    def cached(self, deriv):
+        share = self.cache
+        return lambda c: share.enter((deriv, c), lambda: deriv(c))
+
+    def release(self):
+        "Drop this Maker's entries from the shared cache, if any."
+        if self.cache is not None: self.cache.release()
 
     def alt(self, *res):
         acc = collect_alternatives(res)
@@ -46,7 +64,7 @@ class Maker:
     def _alt(self, re_set):
         return mark(any(re.nullable for re in re_set),
                     lambda c: self.alt(*[re.deriv(c) for re in re_set]),
-                    'alt', re_set)
+                    'alt', re_set, self.memo)
 
     def seq(self, *res):
         if fail in res: return fail
@@ -64,7 +82,7 @@ class Maker:
             def sequence(c): return self.seq(hd.deriv(c), *tl)
         return mark(all(re.nullable for re in res),
                     sequence,
-                    'seq', res)
+                    'seq', res, self.memo)
 
     def many(self, re):
         if re is fail or re is empty: return empty
@@ -73,7 +91,23 @@ class Maker:
 
     def _many(self, re):
         def loop(c): return self.seq(re.deriv(c), loop)
-        return mark(True, loop, 'many', (re,))
+        return mark(True, loop, 'many', (re,), self.memo)
+
+    def repeat(self, re, m, n):
+        "re{m,n}, as one node that counts down as it takes derivatives."
+        if re.nullable: m = 0   # (Then re{m,n} == re{0,n}.)
+        if n == 0 or re is empty: return empty
+        if re is fail: return empty if m == 0 else fail
+        if n is None and m == 0: return self.many(re)
+        if n == 1 and m == 1: return re
+        return self.mkrepeat(re, m, n)
+
+    def _repeat(self, re, m, n):
+        rest = (max(0, m - 1), None if n is None else n - 1)
+        def repeat(c): return self.seq(re.deriv(c), self.repeat(re, *rest))
+        counted = mark(m == 0, repeat, 'repeat', (re,), self.memo)
+        counted.bounds = (m, n)
+        return counted
 
     def make_scanner(self, whitespace, res):
         return self.seq(self.many(whitespace), reduce(self.alt, res))
@@ -97,9 +131,44 @@ def collect_sequence(res):
             acc.append(re)
     return tuple(acc)
 
+def classes(re):
+    """Return re's derivative classes: a partition of the alphabet such
+    that all the chars in a class give the same derivative. It's a
+    tuple of disjoint frozensets, plus an implicit class of all the
+    other chars. (See "Regular-expression derivatives reexamined".)"""
+    if not hasattr(re, 'classes'):
+        if re.tag is 'lit':
+            re.classes = (frozenset(re.args),)
+        elif re.tag is 'alt':
+            re.classes = meet(map(classes, re.args))
+        elif re.tag is 'seq':
+            # Only the prefix up to the first non-nullable re can matter:
+            for i, r in enumerate(re.args):
+                if not r.nullable: break
+            re.classes = meet(map(classes, re.args[:i+1]))
+        elif re.tag is 'many' or re.tag is 'repeat':
+            re.classes = classes(re.args[0])
+        else:
+            re.classes = ()
+    return re.classes
+
+def meet(partitions):
+    "The coarsest partition that refines all of partitions."
+    signatures = {}
+    for k, partition in enumerate(partitions):
+        for i, chars in enumerate(partition):
+            for c in chars:
+                signatures.setdefault(c, [-1] * len(partitions))[k] = i
+    groups = {}
+    for c, signature in signatures.items():
+        groups.setdefault(tuple(signature), set()).add(c)
+    return tuple(sorted(map(frozenset, groups.values()), key=min))
+
 def show(re):
     if re.tag is 'lit':
         return repr(re.args)
+    if re.tag is 'repeat':
+        return 'repeat(%s, %d, %r)' % ((show(re.args[0]),) + re.bounds)
     return '%s(%s)' % (re.tag, ', '.join(map(show, re.args)))
 
 ## mk = Maker()
@@ -171,3 +240,33 @@ def show(re):
 #. True
 ## mk.many(mk.lit('x')) is mk.many(mk.lit('x'))
 #. True
+
+## x2_3 = mk.repeat(mk.lit('x'), 2, 3)
+## [match(x2_3, 'x' * i) for i in range(5)]
+#. [False, False, True, True, False]
+## show(x2_3), show(x2_3.deriv('x'))
+#. ("repeat('x', 2, 3)", "repeat('x', 1, 2)")
+## x2_3.deriv('x').deriv('x') is mk.repeat(mk.lit('x'), 0, 1)
+#. True
+## [match(mk.repeat(mk.many(mk.lit('x')), 2, 2), s) for s in ['', 'x', 'xxxx']]
+#. [True, True, True]
+## classes(mk.repeat(mk.seq(mk.lit('a'), mk.lit('b')), 1, None))
+#. (frozenset(['a']),)
+
+## classes(mk.seq(mk.many(mk.alt(mk.lit('a'), mk.lit('b'))), mk.lit('c')))
+#. (frozenset(['a']), frozenset(['b']), frozenset(['c']))
+## classes(mk.alt(mk.seq(mk.lit('a'), mk.lit('b')), mk.lit('c')))
+#. (frozenset(['a']), frozenset(['c']))
+
+## from boundedcache import BoundedCache
+## cache = BoundedCache(20)
+## bmk = Maker(cache)
+## re = bmk.seq(bmk.many(bmk.alt(bmk.lit('a'), bmk.lit('b'))), bmk.lit('b'))
+## [match(re, s) for s in ['ab', 'ba', 'abab' * 10, 'aaa']]
+#. [True, False, True, False]
+## cache.set_capacity(2)
+## [match(re, s) for s in ['ab', 'ba', 'abab' * 10, 'aaa']]
+#. [True, False, True, False]
+## bmk.release()
+## cache.stats()['size']
+#. 0
@@ -15,22 +15,33 @@ the state counts against methods that go through an NFA.
 
 from deriv2 import *
 
-def make_dfa(re):
+all_bytes = map(chr, range(256))
+
+def make_dfa(re, alphabet=all_bytes):
     """A DFA is a list of pairs (accepting: bool, moves: dict(char->index)).
     where an index is a state number -- a position in the list;
     and 'accepting' means state #i is an accepting state;
     and moves[c] is omitted if c leads to the (implicit) failure state.
-    (This keeps the tables much smaller for toy examples at least.)"""
+    (This keeps the tables much smaller for toy examples at least.)
+    alphabet lists the chars to try moves on: pass the class
+    representatives from byteclass.byte_classes() to get moves per
+    class instead of per byte. Either way, we only take one
+    derivative per derivative class of each state."""
     state_nums, dfa = {}, []
     def fill_in(re):
         moves = {}
         state_nums[re] = len(dfa)
         dfa.append((re.nullable, moves))
-        for c in range(256):
-            next_state = re.deriv(chr(c))
+        class_of = dict((c, k) for k, chars in enumerate(classes(re))
+                               for c in chars)
+        derivs = {}             # class number (or -1 for the rest) -> deriv
+        for c in alphabet:
+            k = class_of.get(c, -1)
+            if k not in derivs: derivs[k] = re.deriv(c)
+            next_state = derivs[k]
             if next_state is not fail:
                 if next_state not in state_nums: fill_in(next_state)
-                moves[chr(c)] = state_nums[next_state]
+                moves[c] = state_nums[next_state]
     fill_in(re)
     return dfa
 
@@ -6,16 +6,12 @@ derivatives reexamined". It probably won't do as well as DFAs via
 derivatives, since we don't use all the simplification rules; but it
 did improve on naive Thompson NFA->DFA here.
 
-TODO:
 Memoization coalesces states that act like equivalent suffixes of a
-regex, but it doesn't help with common prefixes. We could catch those
-too with a second pass that takes the NFA and builds a reversed NFA,
-memoizing in the same way. (Right?) If we take this approach, it'd
-make sense for the first pass to go left to right (instead of the
-current right-to-left) so that after the second pass the arrows point
-forwards.
-
-Simple example input this should help with:
+regex, but it doesn't help with common prefixes. So Maker(True) adds
+a second pass over the NFA, share_prefixes(), that also merges states
+expecting the same char from the same predecessors -- hash-consing in
+reverse -- alternating with the forward merging until neither finds
+more. Simple example input this helps with:
 
     hello|hellward|awkward|jello
 
@@ -24,15 +20,6 @@ What's a good more-complex example including loops?
 (Would it be just as good, and easier, to do this bidirectional
 memoizing at the regex level and then just NFAify in one pass as
 before?)
-
-So, like this? (but memoized) --
-
-reverse rk AcceptingNode       = rk
-reverse rk (ExpectingNode n k) = reverse k (ExpectingNode n rk)
-reverse rk (ForkNode k1 k2)    = reverse rk k1 `fork` reverse rk k2
-reverse rk (LoopNode k makeK) = loop where
-                                loop = LoopNode (reverse rk k)
-                                                (reverse loop (makeK AcceptingNode))
 """
 
 
@@ -59,13 +46,18 @@ def make_scanner(whitespace, res):
 def prepare((label, re)):
     return re(state_node(make_accepting_state(label)))(set())
 
-def make_dfa(scanner):
+all_bytes = map(chr, range(256))
+
+def make_dfa(scanner, alphabet=all_bytes):
     """A DFA is a list of pairs (label_or_None, moves: dict(char->index)).
     where an index is a state number -- a position in the list;
     and label_or_None can mark an accepting state;
     and moves[c] is omitted if c leads to the (implicit) failure state.
     (This keeps the tables much smaller for toy examples at least.)
-    0 is the implicit start state."""
+    0 is the implicit start state.
+    alphabet lists the chars to try moves on: pass the class
+    representatives from byteclass.byte_classes() to get moves per
+    class instead of per byte."""
     state_nums, dfa = {}, []
     def fill_in(state):
         moves = {}
@@ -73,11 +65,11 @@ def make_dfa(scanner):
         labels = [st.label for st in state if hasattr(st, 'label')]
         label = min(labels) if labels else None
         dfa.append((label, moves))
-        for c in range(256):
-            next_state = step(state, chr(c))
+        for c in alphabet:
+            next_state = step(state, c)
             if next_state:
                 if next_state not in state_nums: fill_in(next_state)
-                moves[chr(c)] = state_nums[next_state]
+                moves[c] = state_nums[next_state]
     fill_in(frozenset(scanner))
     return dfa
 
@@ -99,7 +91,11 @@ def make_accepting_state(label):
     accepting_state.label = label
     return accepting_state
 @memoize
-def expecting_state(char, k): return lambda c: k(set()) if c == char else set()
+def expecting_state(char, k): return make_expecting(char, k)
+def make_expecting(char, k):
+    def expecting(c): return k(set()) if c == char else set()
+    expecting.char, expecting.k = char, k
+    return expecting
 
 @memoize
 def state_node(state): return lambda seen: set([state])
@@ -143,9 +139,102 @@ def seq(re1, re2):
     if re2 is empty: return re1
     return lambda k: re1(re2(k))
 
+
+# The bidirectional pass. We lay the NFA out explicitly, as parallel
+# lists indexed by state number, merge states, and then make the
+# merged NFA back into state functions like the above.
+
+def share_prefixes(scanner):
+    "Return an equivalent scanner with common prefixes (and suffixes) merged."
+    return implicit(*merge_both_ways(*explicit(scanner)))
+
+def explicit(scanner):
+    """Return (chars, labels, succs, start) with the state functions
+    reachable from scanner numbered 0..n-1: state i expects chars[i]
+    (or else accepts with labels[i]) and goes to the states succs[i];
+    start is the set of initial states."""
+    nums, states = {}, []
+    def number(state):
+        if state not in nums:
+            nums[state] = len(states)
+            states.append(state)
+        return nums[state]
+    start = set(map(number, scanner))
+    chars, labels, succs = [], [], []
+    for state in states:        # (states grows as we go.)
+        if hasattr(state, 'label'):
+            chars.append(None)
+            labels.append(state.label)
+            succs.append(frozenset())
+        else:
+            chars.append(state.char)
+            labels.append(None)
+            succs.append(frozenset(map(number, state.k(set()))))
+    return chars, labels, succs, start
+
+def merge_both_ways(chars, labels, succs, start):
+    while True:
+        n = len(chars)
+        chars, labels, succs, start = merge(chars, labels, succs, start,
+                                            succs)
+        preds = [set() for _ in chars]
+        for i, targets in enumerate(succs):
+            for j in targets: preds[j].add(i)
+        chars, labels, succs, start = merge(chars, labels, succs, start,
+                                            [(frozenset(ps), i in start)
+                                             for i, ps in enumerate(preds)])
+        if len(chars) == n:
+            return chars, labels, succs, start
+
+def merge(chars, labels, succs, start, contexts):
+    "Merge the states with the same char, label and context."
+    reps, rep_of = {}, []
+    for i, context in enumerate(contexts):
+        rep_of.append(reps.setdefault((chars[i], labels[i], context),
+                                      len(reps)))
+    m = len(reps)
+    new_chars, new_labels = [None]*m, [None]*m
+    new_succs = [set() for _ in range(m)]
+    for i, r in enumerate(rep_of):
+        new_chars[r], new_labels[r] = chars[i], labels[i]
+        new_succs[r].update(rep_of[j] for j in succs[i])
+    return (new_chars, new_labels, map(frozenset, new_succs),
+            set(rep_of[i] for i in start))
+
+def implicit(chars, labels, succs, start):
+    targets = [[] for _ in chars]
+    states = []
+    for char, label, ts in zip(chars, labels, targets):
+        if char is None:
+            states.append(make_accepting_state(label))
+        else:
+            # (Not expecting_state(): each k here is a new closure, so
+            # memoizing on it would only fill the memo table.)
+            states.append(make_expecting(char, lambda seen, ts=ts: set(ts)))
+    for ts, succ in zip(targets, succs):
+        ts.extend(states[j] for j in succ)
+    return set(states[i] for i in start)
+
+def count_states(scanner):
+    "The number of NFA states reachable from scanner."
+    return len(explicit(scanner)[0])
+
+## mk = Maker(bidirectional=True)
+## res = [seq(seq(lit(c1), lit(c2)), lit(c3)) for c1, c2, c3 in ['hel', 'hex', 'jel']]
+## plain = make_scanner(empty, res)
+## count_states(plain), count_states(mk.make_scanner(empty, res))
+#. (13, 11)
+
 class Struct:
     def __init__(self, **kwargs):
         self.__dict__.update(kwargs)
 
-def Maker():
-    return Struct(**globals())
+def Maker(bidirectional=False):
+    """With bidirectional, the maker's scanners also get their common
+    prefixes merged, by share_prefixes()."""
+    maker = Struct(**globals())
+    if bidirectional:
+        maker.prepare = lambda pair: share_prefixes(prepare(pair))
+        maker.make_scanner = (lambda whitespace, res:
+                              share_prefixes(make_scanner(whitespace, res)))
+    return maker
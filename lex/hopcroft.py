@@ -0,0 +1,70 @@
+"""
+Hopcroft's O(n k log n) DFA minimization, by partition refinement.
+The DFA is given as integers: states 0..n-1, symbols 0..k-1, and a
+flat array of moves, moves[q*k + a] = the state q goes to on a.
+"""
+
+from array import array
+
+def refine(n, k, moves, blocks):
+    """Return the coarsest refinement of blocks (a partition of the
+    states, as a list of lists) in which equivalent states share a
+    block. Blocks come out as sorted lists, in order of creation."""
+    inv_start, inv = invert(n, k, moves)
+    block_of = array('i', [0]) * n
+    members = []
+    for b, states in enumerate(block for block in blocks if block):
+        members.append(set(states))
+        for q in states: block_of[q] = b
+    # Hopcroft's trick: we can leave out any one block to start; and
+    # after a split we need only queue up the smaller half.
+    biggest = max(range(len(members)), key=lambda b: len(members[b])) if members else 0
+    splitters = [(b, a) for b in range(len(members)) if b != biggest
+                        for a in range(k)]
+    while splitters:
+        b, a = splitters.pop()
+        touched = {}            # block -> its states that go into b on a
+        for t in members[b]:
+            i = a*n + t
+            for q in inv[inv_start[i]:inv_start[i+1]]:
+                touched.setdefault(block_of[q], set()).add(q)
+        for y, xs in touched.iteritems():
+            ys = members[y]
+            if len(xs) == len(ys): continue
+            if 2*len(xs) <= len(ys):
+                ys -= xs
+                new = xs
+            else:
+                new = ys - xs   # (Cheap enough, since xs is most of ys.)
+                members[y] = xs
+            nb = len(members)
+            members.append(new)
+            for q in new: block_of[q] = nb
+            splitters.extend((nb, c) for c in range(k))
+    return map(sorted, members)
+
+def invert(n, k, moves):
+    """Return the inverse transitions as arrays (starts, sources):
+    the states going to t on a are sources[starts[i]:starts[i+1]],
+    where i = a*n + t."""
+    starts = array('i', [0]) * (k*n + 1)
+    for q in range(n):
+        for a in range(k):
+            starts[a*n + moves[q*k + a] + 1] += 1
+    for i in range(k*n):
+        starts[i+1] += starts[i]
+    fill = array('i', starts)
+    sources = array('i', [0]) * (n*k)
+    for q in range(n):
+        for a in range(k):
+            i = a*n + moves[q*k + a]
+            sources[fill[i]] = q
+            fill[i] += 1
+    return starts, sources
+
+## # States 0, 1, 2 over {0, 1}: 1 and 2 both accept and loop to each other.
+## refine(3, 2, array('i', [1, 2,  2, 1,  1, 2]), [[1, 2], [0]])
+#. [[1, 2], [0]]
+## # Mod-3 counter, accepting 0 and 3 -- so 0~3, 1~4, 2~5.
+## refine(6, 1, array('i', [1, 2, 3, 4, 5, 0]), [[0, 3], [1, 2, 4, 5]])
+#. [[0, 3], [1, 4], [2, 5]]
@@ -0,0 +1,106 @@
+"""
+Language inclusion and equivalence straight from NFAs, without
+determinizing: the antichain algorithm of De Wulf, Doyen, Henzinger
+and Raskin. To check L(A) <= L(B) we search the pairs (p, S) of a
+state of A and the set of states B could be in after the same input;
+(p, S) is a counterexample if p accepts and nothing in S does. A pair
+(p, S) makes any (p, S') with S' a superset of S redundant -- every
+word that takes (p, S') to a counterexample takes (p, S) to one too --
+so we keep only the minimal sets for each p, and add no pair that's
+subsumed by one we've seen. Searching breadth-first, the first
+counterexample we meet is a shortest one; and taking the strings of
+each length in order, it's the least of those.
+
+An NFA here is anything with .start (a collection of states),
+.step(state, c) (the states it can go to on c) and .accepts(state).
+"""
+
+import dfa_nfa
+from byteclass import byte_classes, charsets
+from parse import make_parser
+
+class NFA:
+    def __init__(self, start, step, accepts):
+        self.start = start
+        self.step = step
+        self.accepts = accepts
+
+def from_dfa_nfa(scanner):
+    "An NFA from dfa_nfa's prepare() or Maker.make_scanner()."
+    return NFA(scanner,
+               lambda state, c: state(c),
+               lambda state: hasattr(state, 'label'))
+
+def from_position((first, follows)):
+    "An NFA from ../regex/nfa_position.py's prepare()."
+    return NFA(first,
+               lambda state, c: follows.get(state, ()) if state[0] == c else (),
+               lambda state: state == (None, 1))
+
+def counterexample(A, B, alphabet):
+    """Return the least of the shortest strings accepted by just one of
+    A and B, or None if they're equivalent. alphabet is the chars to
+    try (say, the byte-class representatives)."""
+    witnesses = [w for w in (missing(A, B, alphabet), missing(B, A, alphabet))
+                 if w is not None]
+    return min(witnesses, key=lambda w: (len(w), w)) if witnesses else None
+
+def equivalent(A, B, alphabet):
+    return counterexample(A, B, alphabet) is None
+
+def included(A, B, alphabet):
+    "Is L(A) a subset of L(B)?"
+    return missing(A, B, alphabet) is None
+
+def missing(A, B, alphabet):
+    """Return the least of the shortest strings in L(A) but not L(B),
+    or None."""
+    alphabet = sorted(alphabet)
+    antichain = {}              # state of A -> minimal sets of B states
+    def add(p, S):
+        sets = antichain.setdefault(p, set())
+        if any(T <= S for T in sets): return False
+        sets.difference_update([T for T in sets if S < T])
+        sets.add(S)
+        return True
+    B_start = frozenset(B.start)
+    candidates = [('', p, B_start) for p in A.start]
+    while candidates:
+        # One length at a time, taking the pairs in order of the strings
+        # that reach them: so a pair is only ever subsumed by one reached
+        # by a string no greater, and the answer doesn't depend on the
+        # order we happen to meet the states in. (Even if (p, S) gets
+        # subsumed later in its level, we still expand it: what subsumed
+        # it may be further from the start.)
+        level = [(w, p, S) for w, p, S in sorted(candidates, key=lambda t: t[0])
+                 if add(p, S)]
+        for w, p, S in level:
+            if A.accepts(p) and not any(B.accepts(s) for s in S):
+                return w
+        candidates = []
+        for w, p, S in level:
+            for c in alphabet:
+                next_S = frozenset(t for s in S for t in B.step(s, c))
+                for next_p in A.step(p, c):
+                    candidates.append((w + c, next_p, next_S))
+    return None
+
+def compare(re_string1, re_string2):
+    """Return a shortest string matched by just one of two regexes (in
+    parse.py's syntax), or None if they're equivalent."""
+    parse = make_parser(dfa_nfa.Maker())
+    A, B = [from_dfa_nfa(dfa_nfa.prepare((0, parse(s))))
+            for s in (re_string1, re_string2)]
+    table, reps = byte_classes(charsets([re_string1, re_string2]))
+    return counterexample(A, B, reps)
+
+## compare('hello|hellward|awkward|jello', '(hell(o|ward))|((aw|j)(kward|ello))')
+#. 'awello'
+## compare('hello|hellward|awkward|jello', '(hell(o|ward))|awkward|(aw|j)ello')
+#. 'awello'
+## compare('(a|b)*', '(a*b*)*')
+## compare('(a|b)*', '(ab*)*')
+#. 'b'
+## compare('(ab)*a', 'a(ba)*')
+## compare('x(ab)*', 'x(ab)*(ab)*ab')
+#. 'x'
@@ -1,16 +1,34 @@
 import dfa_nfa as dfa_module
 #import dfa_deriv2 as dfa_module
 import dfa_statecount
+import byteclass, packed as packing, parse
+from byteclass import byte_classes, charsets
+from lexcache import cached_packed
+from memo import memoize
+from packed import pack
 from parse import make_parser
 
-maker = dfa_module.Maker()
-parse = make_parser(maker)
-
-whitespace = parse('( |\t)*')
+whitespace_string = '( |\t)*'
 re_strings = open('c-lex0').read().splitlines()
-res = map(parse, re_strings)
-alts = maker.make_scanner(whitespace, res)
-dfa = dfa_module.make_dfa(alts)
+
+@memoize
+def build_tables():
+    """Return (dfa, classes, reps), building the DFA from scratch.
+    The DFA's moves are on byte-class representatives: run input through
+    classes (with str.translate) to look them up."""
+    maker = dfa_module.Maker()
+    parse = make_parser(maker)
+    alts = maker.make_scanner(parse(whitespace_string), map(parse, re_strings))
+    classes, reps = byte_classes(charsets([whitespace_string] + re_strings))
+    return dfa_module.make_dfa(alts, reps), classes, reps
+
+# The packed tables come from the on-disk cache when there is one (see
+# lexcache.py), so just loading this module needn't compile anything.
+packed = cached_packed([whitespace_string] + re_strings,
+                       [dfa_module, parse, byteclass, packing],
+                       lambda: pack(*build_tables()))
+
+## dfa, classes, reps = build_tables()
 ## len(dfa)
 #. 75
 from dfa_minimize import minimal_state_count
@@ -26,9 +44,10 @@ def scan(s):
     if s: print 'left over: %r' % s
 
 def scan1(s):
+    dfa, classes, reps = build_tables()
     label, moves = dfa[0]
     accepted = None
-    for i, c in enumerate(s):
+    for i, c in enumerate(s.translate(classes)):
         if c not in moves: break
         label, moves = dfa[moves[c]]
         if label is not None: accepted = (i+1, label)
@@ -54,6 +73,9 @@ def scan1(s):
 #. left over: 'world'
 #. 
 
+## packed.scan('  if for long defined   int world')
+#. ([(0, 0, 2), (10, 2, 4), (0, 4, 5), (13, 5, 8), (0, 8, 9), (4, 9, 13), (0, 13, 14), (1, 14, 21), (0, 21, 24), (3, 24, 27), (0, 27, 28)], 28)
+
 ## dfa_module.dump(dfa)
 #. 0 <0> '\t':1 ' ':1 'b':2 'c':7 'd':20 'e':32 'f':36 'i':43 'l':47 's':51 'u':62 'w':70
 #. 1 <0> '\t':1 ' ':1
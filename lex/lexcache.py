@@ -0,0 +1,132 @@
+"""
+Cache compiled scanners on disk, so a short-lived process can skip
+parsing, NFA-building and determinizing: a Packed's tables go in a
+binary file named by a hash of everything they were made from (the
+regex sources, the source code of the modules that compiled them, and
+this format's version), and later runs memory-map the file and copy
+the arrays out. (Only the modules named go into the hash: a change to
+one of their helpers needs a new version here to invalidate old files.)
+
+It's off unless you ask for it, with a cache_dir argument or by
+setting $LEXCACHE_DIR.
+
+File layout: a header (see header_format), then the 256-byte class
+table, then the moves and labels arrays, in native byte order.
+"""
+
+from array import array
+import hashlib, mmap, os, struct
+
+from packed import Packed
+
+version = 1
+magic = 'LEXC'
+header_format = '=4sI20sIII'    # magic, version, key, itemsize, nstates, nclasses
+header_size = struct.calcsize(header_format)
+byte_order_mark = array('i', [1]).tostring()
+
+def default_dir():
+    "The cache directory from $LEXCACHE_DIR, or None for no caching."
+    return os.environ.get('LEXCACHE_DIR') or None
+
+def cache_key(sources, modules):
+    "A digest of the regex sources and the modules that compile them."
+    return hashlib.sha1(repr((version, source_digest(modules),
+                              list(sources)))).digest()
+
+def source_digest(modules):
+    digest = hashlib.sha1()
+    for module in modules:
+        path = module.__file__
+        if path.endswith(('.pyc', '.pyo')) and os.path.exists(path[:-1]):
+            path = path[:-1]
+        with open(path, 'rb') as f:
+            digest.update('%s %s\n' % (module.__name__, f.read()))
+    return digest.hexdigest()
+
+def cached_packed(sources, modules, build, cache_dir=None):
+    """Return the Packed for sources from the cache if it's there, else
+    call build() to make it, and save it for next time. modules: the
+    modules whose code build() depends on. With no cache_dir and no
+    $LEXCACHE_DIR, just return build()."""
+    cache_dir = cache_dir or default_dir()
+    if cache_dir is None:
+        return build()
+    key = cache_key(sources, modules)
+    path = os.path.join(cache_dir, key.encode('hex') + '.lexc')
+    packed = load(path, key)
+    if packed is None:
+        packed = build()
+        try:
+            save(path, key, packed)
+        except (IOError, OSError):
+            pass                # (No cache then; we can still run.)
+    return packed
+
+def save(path, key, packed):
+    nstates, nclasses = len(packed.labels), packed.nclasses
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    # Write to a temp file and rename it into place, so a concurrent
+    # reader never sees half a file.
+    temp = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp, 'wb') as f:
+        f.write(struct.pack(header_format, magic, version, key,
+                            packed.moves.itemsize, nstates, nclasses))
+        f.write(byte_order_mark)
+        f.write(packed.class_table)
+        f.write(packed.moves.tostring())
+        f.write(packed.labels.tostring())
+    os.rename(temp, path)
+
+def load(path, key):
+    "Return the Packed saved at path under key, or None."
+    try:
+        f = open(path, 'rb')
+    except IOError:
+        return None
+    with f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (mmap.error, ValueError):
+            return None         # (E.g. an empty file.)
+    try:
+        return unpack(buf, key)
+    finally:
+        buf.close()
+
+def unpack(buf, key):
+    if len(buf) < header_size: return None
+    (file_magic, file_version, file_key,
+     itemsize, nstates, nclasses) = struct.unpack_from(header_format, buf)
+    if (file_magic, file_version, file_key, itemsize) != (magic, version, key,
+                                                          len(byte_order_mark)):
+        return None
+    i = header_size + len(byte_order_mark)
+    if buf[header_size:i] != byte_order_mark: return None
+    sizes = [256, nstates * nclasses * itemsize, nstates * itemsize]
+    if len(buf) != i + sum(sizes): return None
+    class_table = buf[i:i+256]
+    i += 256
+    moves = array('i', buf[i:i+sizes[1]])
+    i += sizes[1]
+    labels = array('i', buf[i:i+sizes[2]])
+    return Packed(class_table, moves, labels)
+
+## import shutil, tempfile
+## from packed import pack
+## from byteclass import byte_classes
+## import dfa_nfa as m, dfa_deriv2
+## table, reps = byte_classes([set('a'), set('b')])
+## build = lambda: pack(m.make_dfa(m.prepare((7, m.seq(m.lit('a'), m.many(m.lit('b'))))), reps), table, reps)
+## cache_dir = tempfile.mkdtemp()
+## cached_packed(['ab*'], [m], build, cache_dir).scan('abbb')
+#. ([(7, 0, 4)], 4)
+## cached_packed(['ab*'], [m], lambda: None, cache_dir).scan('ab')
+#. ([(7, 0, 2)], 2)
+## cached_packed(['ab*'], [dfa_deriv2], build, cache_dir).scan('abbb')
+#. ([(7, 0, 4)], 4)
+## len(os.listdir(cache_dir))
+#. 2
+## shutil.rmtree(cache_dir)
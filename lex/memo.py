@@ -1,10 +1,24 @@
 """
-Memoization decorator.
+Memoization decorators.
 """
 
+import weakref
+
 def memoize(f):
     memos = {}
     def memoized(*args):
         if args not in memos: memos[args] = f(*args)
         return memos[args]
     return memoized
+
+def weak_memoize(f):
+    """Like memoize, but a result is only remembered while something
+    else still refers to it. (So results must be weakly referenceable,
+    and never None.)"""
+    memos = weakref.WeakValueDictionary()
+    def memoized(*args):
+        result = memos.get(args)
+        if result is None:
+            result = memos[args] = f(*args)
+        return result
+    return memoized
@@ -0,0 +1,74 @@
+"""
+A DFA packed into flat arrays, for scanning fast-ish in Python:
+moves[state*nclasses + class] is the next state (or -1 for failure),
+labels[state] is the state's label (or -1 for not accepting), and the
+input gets mapped to class numbers up front with str.translate().
+The scanner returns tokens as offsets instead of slicing strings.
+"""
+
+from array import array
+
+class Packed:
+
+    def __init__(self, class_table, moves, labels):
+        self.class_table = class_table # byte -> chr(class number)
+        self.nclasses = 1 + max(map(ord, class_table))
+        self.moves = moves
+        self.labels = labels
+
+    def scan(self, s, i=0, end=None, final=True):
+        """Tokenize s[i:end] by maximal munch. Return a list of
+        (label, start, end) triples, and the offset where we stopped
+        (because no token matched there, or we hit the end).
+        If not final, there's more input after end, so we also stop
+        before any token that reaches end, since it might go on."""
+        if end is None: end = len(s)
+        moves, labels, nclasses = self.moves, self.labels, self.nclasses
+        classes = bytearray(s[i:end].translate(self.class_table))
+        base, n = i, end - i
+        tokens = []
+        i = 0
+        while i < n:
+            state, accepted, j = 0, -1, i
+            while j < n:
+                state = moves[state*nclasses + classes[j]]
+                if state < 0: break
+                j += 1
+                if 0 <= labels[state]: accepted, label = j, labels[state]
+            else:
+                if not final: break
+            if accepted < 0: break
+            tokens.append((label, base+i, base+accepted))
+            i = accepted
+        return tokens, base+i
+
+def pack(dfa, table, reps):
+    """Pack a DFA from make_dfa(_, reps) into a Packed, given
+    (table, reps) from byteclass.byte_classes()."""
+    class_num = dict((rep, chr(k)) for k, rep in enumerate(reps))
+    class_table = ''.join(class_num[rep] for rep in table)
+    nclasses = len(reps)
+    moves = array('i', [-1]) * (len(dfa) * nclasses)
+    labels = array('i', [-1]) * len(dfa)
+    for state, (label, state_moves) in enumerate(dfa):
+        if label is not None and label is not False:
+            labels[state] = label
+        for rep, next_state in state_moves.items():
+            moves[state*nclasses + ord(class_num[rep])] = next_state
+    return Packed(class_table, moves, labels)
+
+## from byteclass import byte_classes
+## import dfa_deriv2 as m
+## mk = m.Maker()
+## table, reps = byte_classes([set('a'), set('b')])
+## p = pack(m.make_dfa(mk.many(mk.seq(mk.lit('a'), mk.lit('b'))), reps), table, reps)
+## p.nclasses, p.moves, p.labels
+#. (3, array('i', [-1, 1, -1, -1, -1, 0]), array('i', [1, -1]))
+## p.scan('ababxab')
+#. ([(1, 0, 4)], 4)
+## p.scan('ababxab', 5)
+#. ([(1, 5, 7)], 7)
+## p.scan('abab', 0, 3)
+#. ([(1, 0, 2)], 2)
+## p.scan('abab', 0, 3, final=False)
+#. ([], 0)
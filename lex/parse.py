@@ -30,12 +30,13 @@ expr    = term '|' expr
         / term.
 term    = factor ![)|] term
         / factor.
-factor  = prim stars.
-stars   = '*' stars
+factor  = prim postfix.
+postfix = '*' postfix
+        / '{' bounds '}' postfix
         / .
 prim    = '(' expr ')'                  
         / '\\' any
-        / ![*+?|()\\] any.
+        / ![*+?|()\\{] any.
         / ."""
 
     def parse_expr():
@@ -50,9 +51,19 @@ prim    = '(' expr ')'
         
     def parse_factor():
         factor = parse_prim()
-        while chomp('*'):
-            factor = maker.many(factor)
-        return factor
+        while True:
+            if chomp('*'):
+                factor = maker.many(factor)
+            elif chomp('{'):
+                spec = []
+                while t._ not in ('}', None):
+                    spec.append(t._)
+                    eat()
+                expect('}')
+                m, n = bounds(''.join(spec))
+                factor = repeat(factor, m, n)
+            else:
+                return factor
 
     def parse_prim():
         if chomp('('):
@@ -64,24 +75,57 @@ prim    = '(' expr ')'
             c = t._
             eat()
             return maker.lit(c)
-        if t._ is None or t._ in '*()\\':
+        if t._ is None or t._ in '*()\\{':
             return maker.empty
         c = t._
         eat()
         return maker.lit(c)
 
+    repeat = getattr(maker, 'repeat', None) or (
+        lambda re, m, n: expand_repeat(maker, lambda: re, m, n))
+
     eat()
     expr = parse_expr()
     if t._ is not None:
         raise SyntaxError
     return expr
 
+def bounds(spec):
+    """Parse the inside of a {m,n} repetition: 'm,n'; 'm,' for no upper
+    bound; ',n' for m=0; or 'm' for exactly m. Return (m, n), with n
+    None for no bound."""
+    lo, comma, hi = spec.partition(',')
+    if all(part == '' or part.isdigit() for part in (lo, hi)):
+        m = int(lo) if lo else 0
+        n = (int(hi) if hi else None) if comma else m
+        if n is None or m <= n: return m, n
+    raise SyntaxError('Bad repetition: {%s}' % spec)
+
+def expand_repeat(maker, copy, m, n):
+    """re{m,n} from the maker's other constructors, for makers without
+    repeat(). copy() returns re (or a fresh copy of it); we call it
+    at least once, and for the copies from right to left."""
+    if n is None:
+        tail = maker.many(copy())
+    else:
+        tail = None
+        for _ in range(n - m):
+            tail = maker.alt(maker.empty, copy() if tail is None
+                                          else maker.seq(copy(), tail))
+    for _ in range(m):
+        tail = copy() if tail is None else maker.seq(copy(), tail)
+    if tail is None:
+        copy()
+        return maker.empty
+    return tail
+
 class TreeMaker:
     empty = 'empty'
     def lit(self, s): return repr(s)
     def alt(self, t1, t2): return 'alt(%s, %s)' % (t1, t2)
     def seq(self, t1, t2): return 'seq(%s, %s)' % (t1, t2)
     def many(self, t): return 'many(%s)' % t
+    def repeat(self, t, m, n): return 'repeat(%s, %d, %r)' % (t, m, n)
 
 p = make_parser(TreeMaker())
 
@@ -103,3 +147,18 @@ p = make_parser(TreeMaker())
 #. "seq('h', seq(many(seq('e', 'y')), seq('y', seq('o', 'u'))))"
 ## p(r'a\*b')
 #. "seq('a', seq('*', 'b'))"
+## p(r'ab{2,5}c')
+#. "seq('a', seq(repeat('b', 2, 5), 'c'))"
+## p(r'(ab){3}*{,2}')
+#. "repeat(many(repeat(seq('a', 'b'), 3, 3)), 0, 2)"
+## p(r'a{1,}')
+#. "repeat('a', 1, None)"
+## p(r'a{2,1}')
+#. SyntaxError: Bad repetition: {2,1}
+## p(r'a\{')
+#. "seq('a', '{')"
+## class Expander(TreeMaker): repeat = None
+## make_parser(Expander())(r'a{1,3}')
+#. "seq('a', alt(empty, seq('a', alt(empty, 'a'))))"
+## make_parser(Expander())(r'a{2,}')
+#. "seq('a', seq('a', many('a')))"
@@ -0,0 +1,100 @@
+"""
+Products of DFAs built on the fly: unlike DFA.cross_product, which
+makes every pair of states, we explore only the pairs reachable from
+the start pair. And to check emptiness or equivalence we needn't
+build anything: search breadth-first and stop at the first
+accepting (or distinguishing) state, returning a shortest word that
+gets there as the counterexample.
+"""
+
+from collections import deque
+
+import DFA
+
+def lazy_product(D1, D2, accept_method):
+    """Like DFA.cross_product, but with only the reachable pairs."""
+    assert D1.alphabet == D2.alphabet
+    alphabet = sorted(D1.alphabet)
+    accepts1, accepts2 = set(D1.accepts), set(D2.accepts)
+    start = (D1.start, D2.start)
+    transitions = {}
+    to_process = [start]
+    while to_process:
+        pair = to_process.pop()
+        if pair in transitions: continue
+        s1, s2 = pair
+        transitions[pair] = moves = {}
+        for c in alphabet:
+            moves[c] = next = (D1.delta(s1, c), D2.delta(s2, c))
+            if next not in transitions:
+                to_process.append(next)
+    accepts = [(s1, s2) for s1, s2 in transitions
+               if accept_method(s1 in accepts1, s2 in accepts2)]
+    return DFA.DFA(states=transitions.keys(), alphabet=alphabet,
+                   delta=lambda pair, c: transitions[pair][c],
+                   start=start, accepts=accepts)
+
+def intersection(D1, D2):
+    return lazy_product(D1, D2, bool.__and__)
+
+def union(D1, D2):
+    return lazy_product(D1, D2, bool.__or__)
+
+def symmetric_difference(D1, D2):
+    return lazy_product(D1, D2, bool.__xor__)
+
+def shortest_word(D):
+    "Return a shortest list of symbols that D accepts, or None."
+    accepts = set(D.accepts)
+    return search(D.start, lambda q: q in accepts,
+                  lambda q, c: D.delta(q, c), sorted(D.alphabet))
+
+def is_empty(D):
+    return shortest_word(D) is None
+
+def counterexample(D1, D2):
+    """Return a shortest word (list of symbols) accepted by just one of
+    D1 and D2, or None if they're equivalent."""
+    assert D1.alphabet == D2.alphabet
+    accepts1, accepts2 = set(D1.accepts), set(D2.accepts)
+    return search((D1.start, D2.start),
+                  lambda (s1, s2): (s1 in accepts1) != (s2 in accepts2),
+                  lambda (s1, s2), c: (D1.delta(s1, c), D2.delta(s2, c)),
+                  sorted(D1.alphabet))
+
+def equivalent(D1, D2):
+    return counterexample(D1, D2) is None
+
+def search(start, is_goal, delta, alphabet):
+    "Breadth-first search for a shortest path from start to a goal."
+    parent = {start: None}      # state -> (previous state, symbol)
+    frontier = deque([start])
+    while frontier:
+        q = frontier.popleft()
+        if is_goal(q):
+            word = []
+            while parent[q] is not None:
+                q, c = parent[q]
+                word.append(c)
+            return word[::-1]
+        for c in alphabet:
+            next = delta(q, c)
+            if next not in parent:
+                parent[next] = (q, c)
+                frontier.append(next)
+    return None
+
+## len(intersection(DFA.modular_zero(6), DFA.modular_zero(4)).states)
+#. 12
+## len(DFA.intersection(DFA.modular_zero(6), DFA.modular_zero(4)).states)
+#. 24
+## shortest_word(intersection(DFA.modular_zero(3), DFA.inverse(DFA.modular_zero(2))))
+#. ['1', '1']
+## is_empty(intersection(DFA.modular_zero(2), DFA.inverse(DFA.modular_zero(4))))
+#. False
+## is_empty(intersection(DFA.modular_zero(4), DFA.inverse(DFA.modular_zero(2))))
+#. True
+## counterexample(DFA.modular_zero(6), DFA.modular_zero(3))
+#. ['1', '1']
+## equivalent(DFA.modular_zero(4), intersection(DFA.modular_zero(2), DFA.modular_zero(4)))
+#. True
@@ -0,0 +1,110 @@
+"""
+Tokenize big inputs with a packed DFA, without copying them: regular
+files get memory-mapped, and other file objects (like pipes) get read
+in chunks. Tokens come out as (label, start, end) offsets into the
+input. We scan a window at a time, so the only copies are of one
+window's worth of class numbers, plus, when reading a pipe, a partial
+token left over at the end of a chunk.
+"""
+
+import mmap, sys
+
+class ScanError(Exception): pass
+
+window_size = 1 << 20
+
+def tokenize_files(packed, sources):
+    "Yield (source, label, start, end) for each token in each source."
+    for source in sources:
+        for label, start, end in tokenize(packed, source):
+            yield source, label, start, end
+
+def tokenize(packed, source):
+    """Yield (label, start, end) for each token in source, a filename
+    or a file object."""
+    f = open(source, 'rb') if isinstance(source, basestring) else source
+    try:
+        buf = map_file(f)
+        if buf is None:
+            for token in tokenize_chunks(packed, f):
+                yield token
+        else:
+            try:
+                for token in tokenize_buffer(packed, buf):
+                    yield token
+            finally:
+                buf.close()     # (Don't wait for the GC to unmap it.)
+    finally:
+        if f is not source: f.close()
+
+def map_file(f):
+    "Return a read-only mmap of f, or None if we can't map it."
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, EnvironmentError, ValueError):
+        return None   # (No fileno, a pipe, an empty file...)
+
+def tokenize_buffer(packed, buf):
+    i, size, window = 0, len(buf), window_size
+    while i < size:
+        end = min(i + window, size)
+        tokens, stop = packed.scan(buf, i, end, end == size)
+        for token in tokens:
+            yield token
+        check_progress(packed, buf, stop, end, end == size)
+        # If a single token fills the window, we need a bigger one.
+        window = window*2 if stop == i else window_size
+        i = stop
+
+def tokenize_chunks(packed, f):
+    buf, base, eof = '', 0, False
+    while not eof:
+        chunk = f.read(window_size)
+        eof = not chunk
+        buf += chunk
+        tokens, stop = packed.scan(buf, 0, len(buf), eof)
+        for label, start, end in tokens:
+            yield label, base+start, base+end
+        check_progress(packed, buf, stop, len(buf), eof, base)
+        buf, base = buf[stop:], base+stop
+
+def check_progress(packed, buf, i, end, final, base=0):
+    """Raise ScanError unless the scan stopped at i only because it
+    needs input past end."""
+    if final:
+        if i < end: raise ScanError('No token at offset %d' % (base+i))
+    elif not runs_off_end(packed, buf, i, end):
+        raise ScanError('No token at offset %d' % (base+i))
+
+def runs_off_end(packed, buf, i, end):
+    "Is the DFA still alive after going from i to end?"
+    moves, nclasses = packed.moves, packed.nclasses
+    state = 0
+    for c in bytearray(buf[i:end].translate(packed.class_table)):
+        state = moves[state*nclasses + c]
+        if state < 0: return False
+    return True
+
+def main(argv):
+    import lex
+    sources = argv[1:] or [sys.stdin]
+    for source, label, start, end in tokenize_files(lex.packed, sources):
+        if label != 0:          # (Label 0 is whitespace.)
+            print '%s:%d:%d %d' % (getattr(source, 'name', source),
+                                   start, end, label)
+
+if __name__ == '__main__':
+    main(sys.argv)
+
+## import lex
+## from StringIO import StringIO
+## list(tokenize(lex.packed, StringIO('if for')))
+#. [(10, 0, 2), (0, 2, 3), (13, 3, 6)]
+## window_size = 3
+## list(tokenize(lex.packed, StringIO('defined  int unsigned')))
+#. [(1, 0, 7), (0, 7, 9), (3, 9, 12), (0, 12, 13), (2, 13, 21)]
+## list(tokenize(lex.packed, StringIO('if x')))
+#. ScanError: No token at offset 3
+## list(tokenize(lex.packed, 'c-lex0'))[:3]
+#. ScanError: No token at offset 7
+## window_size = 1 << 20
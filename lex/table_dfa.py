@@ -0,0 +1,172 @@
+"""
+A DFA as a dense transition table, for when DFA.py's function-valued
+delta gets too slow: states are 0..n-1, symbols are numbered by their
+position in the alphabet, and moves[q*k + a] is where state q goes on
+symbol number a, in an array. Operations mostly just make another
+table; convert with from_dfa() and TableDFA.to_dfa().
+"""
+
+from array import array
+
+import DFA
+import hopcroft
+
+class TableDFA:
+
+    def __init__(self, alphabet, moves, start, accepts, names=None):
+        """accepts is a sequence of n flags, one per state; names (by
+        default 0..n-1) are what the states get called in to_dfa()."""
+        self.alphabet = list(alphabet)
+        self.index = dict((c, a) for a, c in enumerate(self.alphabet))
+        self.k = len(self.alphabet)
+        self.moves = array('i', moves)
+        self.start = start
+        self.accepts = bytearray(map(bool, accepts))
+        self.n = len(self.accepts)
+        self.names = list(names) if names is not None else range(self.n)
+
+    def validate(self):
+        assert len(self.index) == self.k
+        assert len(self.moves) == self.n * self.k
+        assert len(self.names) == self.n
+        assert 0 <= self.start < self.n
+        assert all(0 <= q < self.n for q in self.moves)
+
+    def copy(self):
+        return TableDFA(self.alphabet, self.moves, self.start, self.accepts,
+                        self.names)
+
+    def delta(self, q, c):
+        return self.moves[q*self.k + self.index[c]]
+
+    def recognizes(self, char_sequence):
+        """Indicates whether the DFA accepts a given string."""
+        moves, index, k = self.moves, self.index, self.k
+        q = self.start
+        for c in char_sequence:
+            q = moves[q*k + index[c]]
+        return bool(self.accepts[q])
+
+    def reachable(self):
+        """Returns the reachable states, in increasing order."""
+        moves, k = self.moves, self.k
+        reached = bytearray(self.n)
+        reached[self.start] = 1
+        to_process = [self.start]
+        while to_process:
+            q = to_process.pop()
+            for next in moves[q*k:(q+1)*k]:
+                if not reached[next]:
+                    reached[next] = 1
+                    to_process.append(next)
+        return [q for q in range(self.n) if reached[q]]
+
+    def delete_unreachable(self):
+        """Deletes all the unreachable states, renumbering the rest."""
+        return self.collapse([[q] for q in self.reachable()])
+
+    def mn_classes(self):
+        """Returns a partition of the states into Myhill-Nerode
+        equivalence classes, as lists of state numbers."""
+        blocks = [[q for q in range(self.n) if self.accepts[q]],
+                  [q for q in range(self.n) if not self.accepts[q]]]
+        return hopcroft.refine(self.n, self.k, self.moves, blocks)
+
+    def collapse(self, partition):
+        """Given a partition of (a subset of, closed under moves) the
+        states into equivalence classes, make each class into one
+        state, numbered by its position in partition. Returns the
+        array mapping each old state to its new number (or -1)."""
+        k = self.k
+        state_map = array('i', [-1]) * self.n
+        for i, state_class in enumerate(partition):
+            for q in state_class:
+                state_map[q] = i
+        reps = [state_class[0] for state_class in partition]
+        self.moves = array('i', [state_map[next] for q in reps
+                                 for next in self.moves[q*k:(q+1)*k]])
+        self.start = state_map[self.start]
+        self.accepts = bytearray(self.accepts[q] for q in reps)
+        self.names = [self.names[q] for q in reps]
+        self.n = len(reps)
+        return state_map
+
+    def minimize(self):
+        """Classical DFA minimization, by Hopcroft's algorithm."""
+        self.delete_unreachable()
+        self.collapse(self.mn_classes())
+
+    def to_dfa(self):
+        """Returns an equivalent DFA.DFA, with states named by self.names."""
+        names, k = self.names, self.k
+        transitions = {}
+        for q, name in enumerate(names):
+            row = self.moves[q*k:(q+1)*k]
+            transitions[name] = dict((c, names[row[a]])
+                                     for a, c in enumerate(self.alphabet))
+        return DFA.DFA(states=names, alphabet=self.alphabet,
+                       delta=lambda s, c: transitions[s][c],
+                       start=names[self.start],
+                       accepts=[name for q, name in enumerate(names)
+                                if self.accepts[q]])
+
+def from_dfa(D):
+    """Tabulate a DFA.DFA's delta, calling it once per transition."""
+    names = list(D.states)
+    number = dict((q, i) for i, q in enumerate(names))
+    alphabet = sorted(D.alphabet)
+    moves = [number[D.delta(q, c)] for q in names for c in alphabet]
+    accepts = set(D.accepts)
+    return TableDFA(alphabet, moves, number[D.start],
+                    [q in accepts for q in names], names)
+
+#
+# Boolean set operations on languages, like DFA.py's
+#
+
+def cross_product(T1, T2, accept_method):
+    """State (q1, q2) of the product is numbered q1*T2.n + q2, and
+    accepts if accept_method(accepts1[q1], accepts2[q2])."""
+    assert set(T1.alphabet) == set(T2.alphabet)
+    n2, k = T2.n, T1.k
+    columns2 = [T2.index[c] for c in T1.alphabet]
+    moves1, moves2 = T1.moves, T2.moves
+    moves = array('i')
+    for q1 in range(T1.n):
+        row1 = moves1[q1*k:(q1+1)*k]
+        for q2 in range(n2):
+            row2 = moves2[q2*k:(q2+1)*k]
+            moves.extend([row1[a]*n2 + row2[columns2[a]] for a in range(k)])
+    accepts = [accept_method(bool(a1), bool(a2))
+               for a1 in T1.accepts for a2 in T2.accepts]
+    names = [(s1, s2) for s1 in T1.names for s2 in T2.names]
+    return TableDFA(T1.alphabet, moves, T1.start*n2 + T2.start, accepts, names)
+
+def intersection(T1, T2):
+    return cross_product(T1, T2, bool.__and__)
+
+def union(T1, T2):
+    return cross_product(T1, T2, bool.__or__)
+
+def symmetric_difference(T1, T2):
+    return cross_product(T1, T2, bool.__xor__)
+
+def inverse(T):
+    return TableDFA(T.alphabet, T.moves, T.start,
+                    [not a for a in T.accepts], T.names)
+
+## t = from_dfa(DFA.modular_zero(6))
+## t.n, t.recognizes('110'), t.recognizes('111')
+#. (6, True, False)
+## t.minimize()
+## t.n, t.recognizes('110'), t.recognizes('111')
+#. (4, True, False)
+## both = intersection(t, from_dfa(DFA.modular_zero(4)))
+## both.n, both.recognizes('1100'), both.recognizes('110')
+#. (16, True, False)
+## both.minimize()
+## both.n
+#. 5
+## d = inverse(t).to_dfa()
+## d.recognizes('110'), d.recognizes('111')
+#. (False, True)
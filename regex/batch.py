@@ -0,0 +1,89 @@
+"""
+Match one regex against a whole batch of (typically short) strings at
+once, bit-sliced: glushkov.py keeps a bit per NFA state in one int;
+here we keep one int per state (position), with a bit per string, so
+that a step over character position t moves every string at once:
+
+    states[p] = (the union of states[r] over the r that p follows)
+                & strings_with[char of p at t]
+
+strings_with[c] comes from the batch's t'th column (each string's
+t'th char) by str.translate and int(..., 2), so it's C-speed. A string
+of length t accepts if some final position has its bit after step t.
+We go in chunks of strings, so a chunk of short strings can stop early
+instead of being padded out to the longest string in the batch.
+"""
+
+from itertools import izip_longest
+
+from glushkov import Positions
+from parse2 import parse
+
+def match_all(re, strings): return Batch(re).match_all(strings)
+
+class Batch:
+
+    def __init__(self, re, chunk_size=1 << 14):
+        "Compile re, in parse2/integrated3 syntax."
+        maker = Positions()
+        nullable, first, last = parse(re, maker)
+        m = len(maker.chars)
+        # (Position 0 is the start; the parsed positions become 1..m.)
+        self.chars = [None] + maker.chars
+        self.preds = [[] for _ in range(m + 1)]
+        for p in first:
+            self.preds[p+1].append(0)
+        for r, ps in enumerate(maker.follows):
+            for p in ps:
+                self.preds[p+1].append(r+1)
+        self.final = sorted(p+1 for p in last) + ([0] if nullable else [])
+        self.tables = dict((c, translation(c)) for c in set(maker.chars))
+        self.chunk_size = chunk_size
+
+    def match_all(self, strings):
+        "Return a list of flags: does each of strings match?"
+        flags = []
+        for i in range(0, len(strings), self.chunk_size):
+            flags.extend(self.match_chunk(strings[i:i+self.chunk_size]))
+        return flags
+
+    def match_chunk(self, strings):
+        n = len(strings)
+        ends = {}               # length -> bits of the strings that long
+        for j, s in enumerate(strings):
+            ends[len(s)] = ends.get(len(s), 0) | (1 << j)
+        states = [0] * len(self.chars)
+        states[0] = (1 << n) - 1
+        accepted = self.accepting(states) & ends.get(0, 0)
+        for t, column in enumerate(izip_longest(*strings, fillvalue='\0')):
+            column = ''.join(column)[::-1]      # (String #0 gets bit #0.)
+            strings_with = dict((c, int(column.translate(table), 2))
+                                for c, table in self.tables.items())
+            states = [0] + [strings_with[c] & or_all(states, preds)
+                            for c, preds in zip(self.chars, self.preds)[1:]]
+            accepted |= self.accepting(states) & ends.get(t+1, 0)
+            if not any(states): break
+        bits = bin(accepted)[2:].zfill(n)
+        return [bit == '1' for bit in reversed(bits)]
+
+    def accepting(self, states):
+        return or_all(states, self.final)
+
+def or_all(states, ps):
+    bits = 0
+    for p in ps: bits |= states[p]
+    return bits
+
+def translation(c):
+    "A str.translate table taking c to '1' and everything else to '0'."
+    return ''.join('1' if chr(b) == c else '0' for b in range(256))
+
+## match_all('a(b|c)*d', ['ad', 'abcbd', 'abca', '', 'xad', 'acd'])
+#. [True, True, False, False, False, True]
+## match_all('(ab)*', ['', 'ab', 'aba', 'abab'])
+#. [True, True, False, True]
+## b = Batch('x*y', chunk_size=2)
+## b.match_all(['y', 'xy', 'xxxxxxxxy', 'xyx', 'yy'])
+#. [True, True, True, False, False]
+## match_all('', ['', 'a']), match_all('a', [])
+#. ([True, False], [])
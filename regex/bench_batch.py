@@ -0,0 +1,53 @@
+"""
+Time batch.py's bit-sliced matcher against calling a one-string
+matcher in a loop, on a batch of short strings.
+Usage: python bench_batch.py [number_of_strings]
+"""
+
+import random, sys, time
+
+import batch, glushkov, integrated3
+
+def patterns():
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    word = '(%s)' % '|'.join(letters)
+    digit = '(%s)' % '|'.join('0123456789')
+    return [('username', '%s(%s|%s|_)*' % (word, word, digit),
+             lambda: random_string(letters + '0123456789_-', 4, 12)),
+            ('path', '/(%s%s*/)*%s*' % (word, word, word),
+             lambda: '/' + '/'.join(random_string(letters, 1, 6)
+                                    for _ in range(random.randint(1, 4)))),
+            ('header', 'gzip|deflate|br|(x-)*identity',
+             lambda: random.choice(['gzip', 'deflate', 'br', 'identity',
+                                    'x-identity', 'compress', 'gzip;q=1']))]
+
+def random_string(alphabet, lo, hi):
+    return ''.join(random.choice(alphabet)
+                   for _ in range(random.randint(lo, hi)))
+
+def timing(f):
+    start = time.time()
+    result = f()
+    return result, time.time() - start
+
+def main(argv):
+    n = int(argv[1]) if 1 < len(argv) else 100000
+    print '%-10s %10s %12s %12s %12s' % ('pattern', 'strings', 'batch',
+                                         'glushkov', 'integrated3')
+    print '%-10s %10s %12s %12s %12s' % ('', '', 'usec/string', 'usec/string',
+                                         'usec/string')
+    for name, re, make_string in patterns():
+        strings = [make_string() for _ in range(n)]
+        b, g = batch.Batch(re), glushkov.Glushkov(re)
+        insns = integrated3.prepare(re)
+        flags, t_batch = timing(lambda: b.match_all(strings))
+        g_flags, t_glushkov = timing(lambda: map(g.match, strings))
+        i_flags, t_integrated3 = timing(
+            lambda: [integrated3.run(insns, s) for s in strings])
+        assert flags == g_flags == i_flags
+        print '%-10s %10d %12.2f %12.2f %12.2f' % (
+            name, n, t_batch / n * 1e6, t_glushkov / n * 1e6,
+            t_integrated3 / n * 1e6)
+
+if __name__ == '__main__':
+    main(sys.argv)
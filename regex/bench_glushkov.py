@@ -0,0 +1,48 @@
+"""
+Time the bit-parallel Glushkov matcher against integrated3 and
+nfa_intset on a few kinds of pattern. (nfa_intset's match() compiles
+as well as runs, so its times include compiling.)
+Usage: python bench_glushkov.py [text_length]
+"""
+
+import random, sys, time
+
+import glushkov, integrated3, nfa_intset, parse2
+
+def patterns():
+    words = [''.join(random.choice('abcdefgh') for _ in range(6))
+             for _ in range(200)]
+    return [('literal x50', 'ab' * 25, lambda n: 'ab' * 25),
+            ('(a|b)*a(a|b)^3', '(a|b)*a(a|b)(a|b)(a|b)',
+             lambda n: ''.join(random.choice('ab') for _ in range(n))),
+            ('(ab|a)*b', '(ab|a)*b',
+             lambda n: ''.join(random.choice(['a', 'ab']) for _ in range(n//2))),
+            ('200 words*', '(%s)*' % '|'.join(words),
+             lambda n: ''.join(random.choice(words) for _ in range(n//6)))]
+
+def timing(f, texts):
+    start = time.time()
+    for text in texts: f(text)
+    return (time.time() - start) / sum(map(len, texts)) * 1e6
+
+def main(argv):
+    n = int(argv[1]) if 1 < len(argv) else 1000
+    print '%-16s %10s %12s %12s %12s' % ('pattern', 'positions', 'glushkov',
+                                         'integrated3', 'nfa_intset')
+    print '%-16s %10s %12s %12s %12s' % ('', '', 'usec/char', 'usec/char',
+                                         'usec/char')
+    for name, re, make_text in patterns():
+        texts = [make_text(n) for _ in range(5)]
+        g = glushkov.Glushkov(re)
+        insns = integrated3.prepare(re)
+        intset_re = parse2.parse(re, nfa_intset)
+        for text in texts:
+            assert g.match(text) == integrated3.run(insns, text)
+        print '%-16s %10d %12.2f %12.2f %12.2f' % (
+            name, g.npositions,
+            timing(g.match, texts),
+            timing(lambda text: integrated3.run(insns, text), texts),
+            timing(lambda text: nfa_intset.match(intset_re, text), texts[:1]))
+
+if __name__ == '__main__':
+    main(sys.argv)
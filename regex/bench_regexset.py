@@ -0,0 +1,50 @@
+"""
+Time RegexSet.matches against calling integrated3.match once per
+pattern, as the number of patterns grows.
+Usage: python bench_regexset.py [max_patterns]
+"""
+
+import random, sys, time
+
+import integrated3
+from regexset import RegexSet
+
+alphabet = 'abcdefgh'
+
+def make_pattern():
+    word = lambda: ''.join(random.choice(alphabet)
+                           for _ in range(random.randint(2, 5)))
+    return '%s(%s|%s)*%s' % (word(), word(), word(), word())
+
+def make_line():
+    return ''.join(random.choice(alphabet) for _ in range(random.randint(5, 40)))
+
+def timing(f, lines):
+    start = time.time()
+    for line in lines: f(line)
+    return (time.time() - start) / len(lines)
+
+def main(argv):
+    max_patterns = int(argv[1]) if 1 < len(argv) else 10000
+    lines = [make_line() for _ in range(2000)]
+    print '%8s %14s %14s %8s %8s' % ('patterns', 'set usec/line',
+                                     'loop usec/line', 'states', 'hit rate')
+    n = 10
+    while n <= max_patterns:
+        patterns = [make_pattern() for _ in range(n)]
+        rs = RegexSet(patterns)
+        set_time = timing(rs.matches, lines)
+        # (The loop gets slow, so just sample it for big pattern counts.)
+        some_lines = lines[:max(10, 20000 // n)]
+        insns = map(integrated3.prepare, patterns)
+        loop_time = timing(lambda line: [integrated3.run(p, line)
+                                         for p in insns],
+                           some_lines)
+        stats = rs.dfa.stats()
+        print '%8d %14.1f %14.1f %8d %8.3f' % (
+            n, set_time * 1e6, loop_time * 1e6, stats['states'],
+            stats['hits'] / float(stats['hits'] + stats['misses']))
+        n *= 10
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -1,19 +1,33 @@
 """
 Regular expression matching, and incremental DFA construction, using
 even-more-simplified and memoized Brzozowski derivatives.
+
+Each node knows its derivative classes (as in "Regular-expression
+derivatives reexamined"): a partition of the alphabet such that all
+the chars in a class give the same derivative. So we memoize
+derivatives per class instead of per char, and deriv_class(c) tells
+you which other chars act like c. A partition is a tuple of disjoint
+frozensets, plus an implicit class of all the other chars.
+
+A counted repetition re{m,n} stays one node carrying its bounds, and
+its derivative is re's derivative followed by re{m-1,n-1}: so a{1000}
+makes a chain of 1000 small derivatives, not a 1000-node regex.
+
+By default every node memoizes its derivatives forever. For a
+long-running process compiling lots of regexes, pass the Maker a
+share of a boundedcache.BoundedCache: then the derivatives go in that
+bounded cache, the hash-consing tables only hold nodes weakly, and
+Maker.release() drops the regex's cache entries.
+
 TODO:
  - Show the DFAs
- - Generalize the paths taken, a la EBG, so you don't have to
-   re-derive derivatives for different characters that you can
-   tell act the same. (Though this can be more costly -- the
-   other characters might never appear.)
-   Scheme: make deriv(c) return both the derivative and a set
-   of characters that give the same derivative.
  - intersection and complement
  - more tests
  - fuller API
 """
 
+import weakref
+
 def match(re, s):
     for c in s:
         # (This redundant test lets us exit early sometimes.)
@@ -27,14 +41,59 @@ class MemoTable(dict):
             self[key] = make()
         return self[key]
 
+class WeakMemoTable(weakref.WeakValueDictionary):
+    def enter(self, key, make):
+        value = self.get(key)
+        if value is None:
+            value = self[key] = make()
+        return value
+
 class RE(object):
-    def __init__(self):
-        self.transitions = MemoTable()
+    classes = ()
+    class_index = {}
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.transitions = MemoTable() if cache is None else None
+    def set_classes(self, classes):
+        self.classes = classes
+        self.class_index = dict((c, i)
+                                for i, chars in enumerate(classes)
+                                for c in chars)
     def deriv(self, c):
-        return self.transitions.enter(c, lambda: self.derivative(c))
+        k = self.class_index.get(c, -1)
+        if self.cache is None:
+            return self.transitions.enter(k, lambda: self.derivative(c))
+        return self.cache.enter((self, k), lambda: self.derivative(c))
+    def deriv_class(self, c):
+        """Return the derivative by c, and the set of chars that have
+        the same derivative."""
+        k = self.class_index.get(c, -1)
+        chars = Others(self.class_index) if k == -1 else self.classes[k]
+        return self.deriv(c), chars
     def derivative(self, c):
         abstract
 
+class Others(object):
+    "The chars not in a partition's explicit classes."
+    def __init__(self, excluded):
+        self.excluded = frozenset(excluded)
+    def __contains__(self, c):
+        return c not in self.excluded
+    def __repr__(self):
+        return 'Others(%r)' % ''.join(sorted(self.excluded))
+
+def meet(partitions):
+    "The coarsest partition that refines all of partitions."
+    signatures = {}
+    for k, partition in enumerate(partitions):
+        for i, chars in enumerate(partition):
+            for c in chars:
+                signatures.setdefault(c, [-1] * len(partitions))[k] = i
+    groups = {}
+    for c, signature in signatures.items():
+        groups.setdefault(tuple(signature), set()).add(c)
+    return tuple(sorted(map(frozenset, groups.values()), key=min))
+
 class Fail(RE):
     nullable = False
     def derivative(self, c):
@@ -49,30 +108,36 @@ empty = Empty()
 
 class Lit(RE):
     nullable = False
-    def __init__(self, c):
-        RE.__init__(self)
+    def __init__(self, c, cache=None):
+        RE.__init__(self, cache)
         assert len(c) == 1
         self.c = c
+        self.set_classes((frozenset(c),))
     def derivative(self, c):
         return empty if c == self.c else fail
 
 class Alt(RE):
     def __init__(self, mk, re_set):
-        RE.__init__(self)
+        RE.__init__(self, mk.cache)
         assert isinstance(re_set, frozenset)
         self.nullable = any(re.nullable for re in re_set)
         self.mk = mk
         self.re_set = re_set
+        self.set_classes(meet([re.classes for re in re_set]))
     def derivative(self, c):
         return self.mk.alt(*[re.deriv(c) for re in self.re_set])
 
 class Seq(RE):
     def __init__(self, mk, res):
-        RE.__init__(self)
+        RE.__init__(self, mk.cache)
         assert isinstance(res, tuple) and 0 < len(res)
         self.nullable = all(re.nullable for re in res)
         self.mk = mk
         self.res = res
+        # Only the prefix up to the first non-nullable re can matter:
+        for i, re in enumerate(res):
+            if not re.nullable: break
+        self.set_classes(meet([re.classes for re in res[:i+1]]))
     def derivative(self, c):
         re, res = self.res[0], self.res[1:]
         blocking = self.mk.seq(re.deriv(c), *res)
@@ -82,22 +147,47 @@ class Seq(RE):
 class Many(RE):
     nullable = True
     def __init__(self, mk, re):
-        RE.__init__(self)
+        RE.__init__(self, mk.cache)
         self.mk = mk
         self.re = re
+        self.set_classes(re.classes)
     def derivative(self, c):
         return self.mk.seq(self.re.deriv(c), self)
 
+class Repeat(RE):
+    "re{m,n}: from m to n copies of re (no upper bound if n is None)."
+    def __init__(self, mk, re, m, n):
+        RE.__init__(self, mk.cache)
+        self.nullable = m == 0
+        self.mk = mk
+        self.re = re
+        self.m, self.n = m, n
+        self.set_classes(re.classes)
+    def derivative(self, c):
+        n = None if self.n is None else self.n - 1
+        return self.mk.seq(self.re.deriv(c),
+                           self.mk.repeat(self.re, max(0, self.m - 1), n))
+
 class Maker:
 
-    def __init__(self):
-        self.lits = MemoTable()
-        self.alts = MemoTable()
-        self.seqs = MemoTable()
-        self.stars = MemoTable()
+    empty = empty
+
+    def __init__(self, cache=None):
+        "cache: a BoundedCache to share, or None to memoize without bound."
+        self.cache = cache and cache.share()
+        table = MemoTable if cache is None else WeakMemoTable
+        self.lits = table()
+        self.alts = table()
+        self.seqs = table()
+        self.stars = table()
+        self.repeats = table()
+
+    def release(self):
+        "Drop this Maker's entries from the shared cache, if any."
+        if self.cache is not None: self.cache.release()
 
     def lit(self, c):
-        return self.lits.enter(c, lambda: Lit(c))
+        return self.lits.enter(c, lambda: Lit(c, self.cache))
 
     def alt(self, *res):
         acc = collect_alternatives(res)
@@ -118,6 +208,15 @@ class Maker:
         if isinstance(re, Many): return re
         return self.stars.enter(re, lambda: Many(self, re))
 
+    def repeat(self, re, m, n):
+        if re.nullable: m = 0   # (Then re{m,n} == re{0,n}.)
+        if n == 0 or re is empty: return empty
+        if re is fail: return empty if m == 0 else fail
+        if n is None and m == 0: return self.many(re)
+        if n == 1 and m == 1: return re
+        key = (re, m, n)
+        return self.repeats.enter(key, lambda: Repeat(self, re, m, n))
+
 def collect_alternatives(res):
     acc = []
     for re in res:
@@ -198,4 +297,47 @@ def collect_sequence(res):
 ## mk.many(mk.lit('x')) is mk.many(mk.lit('x'))
 #. True
 
+## abc = mk.seq(mk.many(mk.alt(mk.lit('a'), mk.lit('b'))), mk.lit('c'))
+## abc.classes
+#. (frozenset(['a']), frozenset(['b']), frozenset(['c']))
+## abc.deriv_class('b')[1]
+#. frozenset(['b'])
+## d, chars = abc.deriv_class('z')
+## d is fail, chars, 'y' in chars
+#. (True, Others('abc'), True)
+## [match(abc, s) for s in ['abc', 'xyz', u'\u1234c', 'c', 'wc']]
+#. [True, False, False, True, False]
+## sorted(abc.transitions)   # (Keyed by class, with -1 for Others)
+#. [-1, 0, 1, 2]
+
 ### match(mk.seq(*[mk.alt(mk.lit('a'), mk.seq(mk.lit('a'), mk.lit('a')))]*1200), 'a'*1200)
+
+## from boundedcache import BoundedCache
+## cache = BoundedCache(20)
+## bmk = Maker(cache)
+## re = bmk.seq(bmk.many(bmk.alt(bmk.lit('a'), bmk.lit('b'))), bmk.lit('b'))
+## [match(re, s) for s in ['ab', 'ba', 'abab' * 10, 'aaa']]
+#. [True, False, True, False]
+## st = cache.stats()
+## st['size'], st['evictions'], st['owners']
+#. (11, 0, 1)
+## cache.set_capacity(3)
+## [match(re, s) for s in ['ab', 'ba', 'abab' * 10, 'aaa']]
+#. [True, False, True, False]
+## bmk.release()
+## cache.stats()['size'], bmk.cache.size()
+#. (0, 0)
+
+## from parse import make_parser
+## p = make_parser(mk)
+## a1000 = p('a{1000}')
+## match(a1000, 'a' * 999), match(a1000, 'a' * 1000), match(a1000, 'a' * 1001)
+#. (False, True, False)
+## r = p('(ab|c){2,3}d')
+## [match(r, s) for s in ['abd', 'abcd', 'cabcd', 'ababcabd', 'cccd']]
+#. [False, True, True, False, True]
+## r = p('(a*b){2,}')
+## [match(r, s) for s in ['b', 'bb', 'abaab', 'abaabbb', 'aba']]
+#. [False, True, True, True, False]
+## match(p('(a|){3}b'), 'b'), match(p('a{0}'), ''), match(p('a{0}'), 'a')
+#. (True, True, False)
@@ -0,0 +1,132 @@
+"""
+The Glushkov (position) automaton, as in nfa_position.py, but
+simulated bit-parallel: the state set is one Python int with a bit
+per position, and a step is a handful of bigint operations instead of
+a loop over states. Position 0 is the start; positions 1..m are the
+pattern's literals, numbered left to right. A step on c is
+
+    states = follows(states) & masks[c]
+
+where follows(states) is the union of the follow sets of the
+positions in states. Most follow edges in a typical pattern go from
+position i to i+1, so those we do all at once by a shift, as in
+shift-and; the rest we look up in tables, one per 8 positions with
+any such edges, mapping each byte of the state set to the union of
+its positions' follow sets (Navarro and Raffinot). When there'd be
+too many tables, as with a big alternation, typically few states are
+live at once: then we loop over the live positions with such edges.
+"""
+
+from parse2 import parse
+
+def match(re, s): return Glushkov(re).match(s)
+
+chunk_bits = 8
+max_chunks = 8
+
+class Glushkov:
+
+    def __init__(self, re):
+        "Compile re, in parse2/integrated3 syntax."
+        maker = Positions()
+        nullable, first, last = parse(re, maker)
+        m = len(maker.chars)
+        # The parser goes right to left, so renumber left to right:
+        number = lambda p: m - p
+        follows = [0] * (m + 1)
+        follows[0] = bits(map(number, first))
+        for p, ps in enumerate(maker.follows):
+            follows[number(p)] = bits(map(number, ps))
+        self.npositions = m + 1
+        self.final = bits(map(number, last)) | (1 if nullable else 0)
+        self.masks = {}
+        for p, c in enumerate(maker.chars):
+            self.masks[c] = self.masks.get(c, 0) | (1 << number(p))
+        self.shiftable = 0
+        rest = []
+        for i, f in enumerate(follows):
+            if f & (1 << (i+1)):
+                self.shiftable |= 1 << i
+                f &= ~(1 << (i+1))
+            rest.append(f)
+        self.chunks = []        # [(shift, table)] for the rest
+        for shift in range(0, m + 1, chunk_bits):
+            chunk = rest[shift:shift+chunk_bits]
+            if any(chunk):
+                self.chunks.append((shift, make_table(chunk)))
+        self.sparse = None      # Else {1<<i: rest[i]} for the i with any
+        if max_chunks < len(self.chunks):
+            self.chunks = []
+            self.sparse = dict((1 << i, f) for i, f in enumerate(rest) if f)
+            self.irregular = bits(i for i, f in enumerate(rest) if f)
+
+    def match(self, s):
+        "Does all of s match?"
+        states, masks = 1, self.masks
+        shiftable, chunks = self.shiftable, self.chunks
+        sparse, irregular = self.sparse, self.sparse and self.irregular
+        for c in s:
+            next = (states & shiftable) << 1
+            for shift, table in chunks:
+                next |= table[(states >> shift) & 0xff]
+            if sparse:
+                live = states & irregular
+                while live:
+                    low = live & -live
+                    next |= sparse[low]
+                    live ^= low
+            states = next & masks.get(c, 0)
+            if not states: return False
+        return 0 != (states & self.final)
+
+def make_table(follows):
+    "Map each byte b to the union of follows[i] for the bits i of b."
+    table = [0] * (1 << chunk_bits)
+    for b in range(1, len(table)):
+        low = b & -b
+        i = low.bit_length() - 1
+        table[b] = table[b ^ low] | (follows[i] if i < len(follows) else 0)
+    return table
+
+def bits(positions):
+    return sum(1 << p for p in set(positions))
+
+class Positions:
+    """A parse2 maker making (nullable, first, last) for each regex,
+    as sets of positions, and recording follow sets as it goes. (So
+    each parsed node must be used just once, as the parser does.)"""
+    empty = (True, frozenset(), frozenset())
+    def __init__(self):
+        self.chars = []         # position -> char
+        self.follows = []       # position -> set of positions
+    def lit(self, c):
+        p = len(self.chars)
+        self.chars.append(c)
+        self.follows.append(set())
+        return (False, frozenset([p]), frozenset([p]))
+    def alt(self, (n1, f1, l1), (n2, f2, l2)):
+        return (n1 or n2, f1 | f2, l1 | l2)
+    def seq(self, (n1, f1, l1), (n2, f2, l2)):
+        for p in l1: self.follows[p].update(f2)
+        return (n1 and n2,
+                f1 | f2 if n1 else f1,
+                l1 | l2 if n2 else l2)
+    def many(self, (n, f, l)):
+        for p in l: self.follows[p].update(f)
+        return (True, f, l)
+
+## g = Glushkov('abc')
+## g.shiftable == 0b0111, g.chunks
+#. (True, [])
+## g.match('abc'), g.match('ab'), g.match('abcd')
+#. (True, False, False)
+## g = Glushkov('a(b|c)*d')
+## len(g.chunks), g.match('ad'), g.match('abccbd'), g.match('abca')
+#. (1, True, True, False)
+## g = Glushkov('(%s)*' % '|'.join(['ab', 'cd'] * 40))
+## g.chunks, len(g.sparse), g.match('abcdab'), g.match('abc')
+#. ([], 81, True, False)
+## match('', ''), match('', 'a'), match('a*', ''), match('(a|)b', 'b')
+#. (True, False, True, True)
+## match('(a*)*b', 'aaab'), match('(a*b*)*', 'aaabba'), match('(a*b*)*', 'aaabbc')
+#. (True, True, False)
@@ -1,13 +1,36 @@
 """
 Integrate the right-to-left top-down operator-precedence parser with
 the simplest terminating NFA code. Practically C-level code now for realz.
+
+Counted repetition re{m,n} gets unrolled into copies of re's code by
+default. With counting=True, a repeated single char c{m,n} compiles
+instead to one op_count instruction, followed by the data words m and
+n (-1 for no bound), and the matcher keeps the set of live counter
+values for it in a Counters: since every value goes up by one on each
+c, and they all die on any other char, we store the times they were
+entered, oldest first, and a step costs O(1) however big m and n are.
+(A counting-set automaton, as in Turonova et al., restricted to the
+easy case.)
+
+With captures=True, each parenthesized group gets numbered by its
+'(' from the left, and compiles with an op_save of slot 2*group
+before it and 2*group+1 after it: tags, as in Laurikari's TNFA, which
+search.py's Pike VM records in its threads. Here they're no-ops. In
+this mode an alternation's split prefers its left side, the way a
+star's prefers another time around and each optional copy of a {m,n}
+prefers to be taken, so a thread's priority is the usual backtracking
+order.
 """
 
-def match(re, s): return run(prepare(re), s)
+from collections import deque
+
+from parse import bounds
+
+def match(re, s): return run(prepare(re, counting=True), s)
 
-op_expect, op_jump, op_split = range(3)
-op_names = 'expect jump split'.split()
-ops_shift = 2
+op_expect, op_jump, op_split, op_count, op_save = range(5)
+op_names = 'expect jump split count save'.split()
+ops_shift = 3
 
 def encode(op, arg): return op | (arg << ops_shift)
 def decode(insn): return insn & ((1 << ops_shift) - 1), insn >> ops_shift
@@ -23,7 +46,34 @@ class Bitset:
     def has(self, i): return 0 != (self.words[i//wordlen] & (1 << (i%wordlen)))
     def add(self, i): self.words[i//wordlen] |= 1 << (i%wordlen)
 
-def spread(insns, pc, agenda, visited):
+class Counters:
+    "The live counter values of a program's op_count instructions."
+    def __init__(self, insns):
+        self.insns = insns
+        self.entries = {}       # pc -> deque of entry times, oldest first
+        self.time = 0           # (The number of chars consumed so far)
+    def enter(self, pc):
+        times = self.entries.setdefault(pc, deque())
+        if not times or times[-1] != self.time:
+            times.append(self.time)
+    def advance(self, pc, matched):
+        """Take the values at pc that were live before the current char
+        past it. Return (whether one may exit now, whether any is left)."""
+        m, n = self.insns[pc+1], self.insns[pc+2]
+        times, now = self.entries[pc], self.time
+        fresh = 0 < len(times) and times[-1] == now  # (Entered since that char)
+        if fresh: times.pop()
+        if not matched: times.clear()
+        exit = 0 < len(times) and m <= now - times[0]
+        if n != -1:
+            while times and n <= now - times[0]: times.popleft()
+        else:
+            # All the values >= m are alike, so keep just one of them.
+            while 1 < len(times) and m <= now - times[1]: times.popleft()
+        if fresh: times.append(now)
+        return exit, 0 < len(times)
+
+def spread(insns, pc, agenda, visited, counters=None):
     while True:
         op, arg = decode(insns[pc])
         if op == op_expect:
@@ -35,27 +85,43 @@ def spread(insns, pc, agenda, visited):
             if visited.has(pc):
                 return
             visited.add(pc)
-            spread(insns, arg, agenda, visited)
+            spread(insns, arg, agenda, visited, counters)
+            pc -= 1
+        elif op == op_save:
+            pc -= 1
+        else:
+            assert op == op_count
+            agenda.add(pc)
+            counters.enter(pc)
+            if insns[pc+1] != 0:
+                return
             pc -= 1
 
-def step(insns, agenda, next, visited, c):
+def step(insns, agenda, next, visited, c, counters=None):
     visited.clear()
     for w, bits in enumerate(agenda.words):
         pc = wordlen * w
         while bits:
             if bits & 1:
                 op, arg = decode(insns[pc])
-                assert op == op_expect
-                if arg == ord(c): spread(insns, pc-1, next, visited)
+                if op == op_expect:
+                    if arg == ord(c): spread(insns, pc-1, next, visited, counters)
+                else:
+                    assert op == op_count
+                    exit, left = counters.advance(pc, arg == ord(c))
+                    if left: next.add(pc)
+                    if exit: spread(insns, pc-1, next, visited, counters)
             pc += 1; bits >>= 1
     
 def run(insns, s):
     agenda = Bitset(len(insns))
     visited = Bitset(len(insns))
-    spread(insns, len(insns)-1, agenda, visited)
+    counters = Counters(insns)
+    spread(insns, len(insns)-1, agenda, visited, counters)
     next = Bitset(len(insns))
     for c in s:
-        step(insns, agenda, next, visited, c)
+        counters.time += 1
+        step(insns, agenda, next, visited, c, counters)
         agenda, next = next, agenda
         if agenda.is_empty(): break # Redundant test, can speed it
         next.clear()
@@ -76,9 +142,19 @@ def emit_jump(insns, k):
     if len(insns) - 1 != k:
         insns.append(encode(op_jump, k))
 
-def prepare(re):
-    ts = list(re)
+def prepare(re, counting=False, captures=False):
     insns = []
+    # (256 == an impossible character)
+    start = compile_re(insns, re, emit(insns, op_expect, 256, -1),
+                       counting, captures)
+    emit_jump(insns, start)
+    return insns
+
+def compile_re(insns, re, k, counting=False, captures=False):
+    """Append code for re, continuing to k, to insns; return its start.
+    counting: whether to use op_count for repeated chars.
+    captures: whether to tag the groups with op_save."""
+    ts = list(re)
 
     def parse_expr(precedence, k):
         rhs = parse_factor(k)
@@ -87,7 +163,11 @@ def prepare(re):
             prec = 2 if ts[-1] == '|' else 4
             if prec < precedence: break
             if chomp('|'):
-                rhs = emit(insns, op_split, rhs, parse_expr(prec+1, k))
+                lhs = parse_expr(prec+1, k)
+                if captures:
+                    rhs = emit(insns, op_split, lhs, rhs)
+                else:
+                    rhs = emit(insns, op_split, rhs, lhs)
             else:
                 rhs = parse_expr(prec+1, rhs)
         return rhs
@@ -96,35 +176,82 @@ def prepare(re):
         if not ts or ts[-1] in '|(':
             return k
         elif chomp(')'):
-            e = parse_expr(0, k)
+            if not captures:
+                e = parse_expr(0, k)
+                assert chomp('(')
+                return e
+            close = emit(insns, op_save, 0, k)
+            e = parse_expr(0, close)
             assert chomp('(')
-            return e
+            group = ts.count('(') + 1
+            patch(insns, close, 2*group + 1)
+            return emit(insns, op_save, 2*group, e)
         elif chomp('*'):
             fork = emit_fork(insns, k)
             patch(insns, fork, parse_expr(6, fork))
             return fork
+        elif chomp('}'):
+            spec = []
+            while ts and ts[-1] != '{':
+                spec.append(ts.pop())
+            if not chomp('{'): raise SyntaxError('Unmatched }')
+            m, n = bounds(''.join(reversed(spec)))
+            return parse_repeat(m, n, k)
         else:
             return emit(insns, op_expect, ord(ts.pop()), k)
 
+    def parse_repeat(m, n, k):
+        if counting and n != 0 and ts and ts[-1] not in '|()*{}':
+            pc = emit(insns, op_count, ord(ts.pop()), k)
+            insns.extend([m, -1 if n is None else n])
+            return pc
+        # Else unroll it, compiling the body afresh for each copy:
+        saved, end = ts[:], len(ts)
+        tokens = []
+        def body(k):
+            if tokens: ts.extend(tokens)
+            start = parse_expr(6, k)
+            if not tokens: tokens.extend(saved[len(ts):end])
+            return start
+        if n is None:
+            tail = emit_fork(insns, k)
+            patch(insns, tail, body(tail))
+        else:
+            tail = k
+            for _ in range(n - m):
+                if captures:
+                    tail = emit(insns, op_split, body(tail), k)
+                else:
+                    tail = emit(insns, op_split, k, body(tail))
+        for _ in range(m):
+            tail = body(tail)
+        if m == n == 0:
+            body(k)             # (Just to consume it.)
+        return tail
+
     def chomp(token):
         matches = (ts and ts[-1] == token)
         if matches: ts.pop()
         return matches
 
-    # (256 == an impossible character)
-    start = parse_expr(0, emit(insns, op_expect, 256, -1))
+    start = parse_expr(0, k)
     assert not ts
-    emit_jump(insns, start)
-    return insns
+    return start
 
 
 def show(insns, pc):
+    data = 0                    # (How many data words follow)
     for k, insn in enumerate(insns):
+        if data:
+            print '%2d   %-6s %r' % (k, '', insn)
+            data -= 1
+            continue
         op, arg = decode(insn)
         print ('%2d %s %-6s %r' 
                % (k, '*' if k == pc else ' ',
                   op_names[op], 
-                  chr(arg) if op == op_expect and 0 <= arg < 256 else arg))
+                  chr(arg) if op in (op_expect, op_count) and 0 <= arg < 256 else arg))
+        if op == op_count: data = 2
 
 ## match('', '')
 #. True
@@ -220,7 +347,7 @@ def show(insns, pc):
 #. False
 
 ## prepare('a(bc|d|)*e')
-#. [1024, 404, 34, 400, 10, 9, 396, 392, 18, 9, 388]
+#. [2048, 808, 66, 800, 18, 17, 792, 784, 34, 17, 776]
 ## show(prepare('a**'), 4)
 #.  0   expect 256
 #.  1   split  2
@@ -228,3 +355,37 @@ def show(insns, pc):
 #.  3   expect 'a'
 #.  4 * jump   1
 #. 
+
+## match('a{3}', 'aa'), match('a{3}', 'aaa'), match('a{3}', 'aaaa')
+#. (False, True, False)
+## [match('xa{2,4}y', 'x%sy' % ('a'*i)) for i in range(6)]
+#. [False, False, True, True, True, False]
+## match('(a|b){2,}c', 'ac'), match('(a|b){2,}c', 'abbac')
+#. (False, True)
+## match('(ab){0}c', 'c'), match('(ab){,2}c', 'ababc'), match('(ab){,2}c', 'abababc')
+#. (True, True, False)
+## match('a{999}b', 'a'*999 + 'b'), match('a{999}b', 'a'*998 + 'b')
+#. (True, False)
+## len(prepare('a{999}b', counting=True)), len(prepare('a{999}b'))
+#. (6, 1001)
+## show(prepare('ba{2,}', counting=True), 5)
+#.  0   expect 256
+#.  1   count  'a'
+#.  2          2
+#.  3          -1
+#.  4   jump   1
+#.  5 * expect 'b'
+#. 
+## show(prepare('(a|b)c', captures=True), 8)
+#.  0   expect 256
+#.  1   expect 'c'
+#.  2   save   3
+#.  3   expect 'b'
+#.  4   jump   2
+#.  5   expect 'a'
+#.  6   jump   3
+#.  7   split  5
+#.  8 * save   2
+#. 
+## match('(a|b)*c', 'abac'), run(prepare('(a|b)*c', captures=True), 'abac')
+#. (True, True)
@@ -0,0 +1,109 @@
+"""
+A lazily-built DFA on top of integrated3's bitset NFA. Each distinct
+agenda becomes a DFA state the first time we reach it, and each
+(state, char) transition gets cached, so matching the same pattern
+against lots of input mostly turns into dict lookups.
+
+Like RE2, when the cache holds too many states we just flush it all
+and carry on from the current state; the counters show how often that
+happens and how often we hit vs. miss.
+"""
+
+from integrated3 import prepare, spread, step, Bitset
+
+def match(re, s): return LazyDFA(prepare(re)).run(s)
+
+class State:
+    def __init__(self, words, accepting):
+        self.words = words      # The agenda, as a tuple of bitset words
+        self.accepting = accepting
+        self.moves = {}         # char -> State (filled in lazily)
+        self.dead = not any(words)
+
+class LazyDFA:
+
+    def __init__(self, insns, max_states=10000,
+                 start=None, label=lambda agenda: agenda.has(0)):
+        """insns: a program from integrated3.prepare().
+        max_states: flush the cache rather than grow it past this
+        (which should be at least 2).
+        start: the pc to start from (by default the last insn).
+        label: how to label a state given its agenda (by default,
+        whether it's accepting)."""
+        self.insns = insns
+        self.max_states = max_states
+        self.start_pc = len(insns)-1 if start is None else start
+        self.label = label
+        self.hits = self.misses = self.flushes = 0
+        self.agenda = Bitset(len(insns))
+        self.next = Bitset(len(insns))
+        self.visited = Bitset(len(insns))
+        self.flush()
+
+    def flush(self):
+        self.states = {}        # words -> State
+        self.agenda.clear()
+        self.visited.clear()
+        spread(self.insns, self.start_pc, self.agenda, self.visited)
+        self.start = self.intern(self.agenda)
+
+    def intern(self, agenda):
+        words = tuple(agenda.words)
+        state = self.states.get(words)
+        if state is None:
+            state = self.states[words] = State(words, self.label(agenda))
+        return state
+
+    def run(self, s):
+        "Return the final state's label after consuming s."
+        state = self.start
+        for c in s:
+            next_state = state.moves.get(c)
+            if next_state is None:
+                self.misses += 1
+                next_state = self.compute(state, c)
+            else:
+                self.hits += 1
+            state = next_state
+            if state.dead: break # Redundant test, can speed it
+        return state.accepting
+
+    def compute(self, state, c):
+        """Step the NFA from state on c, and cache the result -- unless
+        that takes a new state and the cache is full: then flush it,
+        keeping just the start and the new state."""
+        self.set_agenda(state.words)
+        self.next.clear()
+        step(self.insns, self.agenda, self.next, self.visited, c)
+        if (self.max_states <= len(self.states)
+            and tuple(self.next.words) not in self.states):
+            self.flushes += 1
+            self.flush()
+            return self.intern(self.next)
+        next_state = state.moves[c] = self.intern(self.next)
+        return next_state
+
+    def set_agenda(self, words):
+        self.agenda.words[:] = words
+        return self.agenda
+
+    def stats(self):
+        return dict(states=len(self.states), hits=self.hits,
+                    misses=self.misses, flushes=self.flushes)
+
+## match('a(bc|d|)*e', 'abcdde')
+#. True
+## match('a(bc|d|)*e', 'abcdd')
+#. False
+
+## m = LazyDFA(prepare('(a|b)*abb'))
+## [m.run(s) for s in ['abb', 'aabb', 'abab', 'babb', 'ab']]
+#. [True, True, False, True, False]
+## sorted(m.stats().items())
+#. [('flushes', 0), ('hits', 11), ('misses', 6), ('states', 4)]
+
+## tiny = LazyDFA(prepare('(a|b)*abb'), max_states=2)
+## [tiny.run(s) for s in ['abb', 'aabb', 'abab', 'babb', 'ab']]
+#. [True, True, False, True, False]
+## tiny.flushes, len(tiny.states)
+#. (14, 2)
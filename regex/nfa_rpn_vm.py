@@ -5,8 +5,16 @@ machine. We differ from Thompson in parsing from right to left, and
 thus needing fewer jump instructions and backpatching only for loops.
 Also in detecting loops at match-time -- we should always terminate,
 if this is correct.
+
+Counted repetition is a postfix {m,n} too, as in 'ab.{2,3}'. Rather
+than copying the operand's code up to n times, we compile it once,
+between a count_enter and a count_loop instruction, and give each
+thread a stack of counters besides its pc: a thread is (pc, counts).
+So the code stays small; the threads, not the instructions, multiply.
 """
 
+from parse import bounds
+
 def match(re, s):
     return run(prepare(re), s)
 
@@ -15,7 +23,7 @@ def prepare(re):
     insns = []
     start = parse(insns, re, emit(insns, expect, EOF, -1))
     assert not re, "Syntax error"
-    return insns, start
+    return insns, (start, ())
 
 def show(insns, pc):
     for k, (operator, operand) in enumerate(insns):
@@ -46,6 +54,20 @@ def parse(insns, re, k):
             plus = parse(insns, re, fork)
             patch(insns, fork, plus)
             return plus
+        elif c == '}':
+            spec = []
+            while re and re[-1] != '{':
+                spec.append(re.pop())
+            if not re: raise SyntaxError('Unmatched }')
+            re.pop()
+            m, n = bounds(''.join(reversed(spec)))
+            if n == 0:
+                parse(insns, re, k) # (Just to consume it.)
+                return k
+            loop = emit(insns, count_loop, None, k)
+            body = parse(insns, re, loop)
+            patch(insns, loop, (m, n, body))
+            return emit(insns, count_enter, k if m == 0 else None, body)
         else:
             return emit(insns, expect, c, k)
 
@@ -63,26 +85,37 @@ def run((insns, start), s):
     for c in s:
         agenda = step(insns, agenda, c)
         if not agenda: break    # Redundant test, can speed it
-    return ACCEPTED in step(insns, agenda, EOF)
+    return (ACCEPTED, ()) in step(insns, agenda, EOF)
 
 def step(insns, agenda, c):
     done, next = set(), set()
     while agenda:
-        pc = agenda.pop()
-        while pc is not None:
-            done.add(pc) # TODO: we could get away with only adding loop headers
-            operator, operand = insns[pc]
-            pc = operator(done, agenda, next, pc, c, operand)
+        thread = agenda.pop()
+        while thread is not None:
+            done.add(thread) # TODO: we could get away with only adding loop headers
+            operator, operand = insns[thread[0]]
+            thread = operator(done, agenda, next, thread, c, operand)
     return next
 
-def jump(done, agenda, next, pc, c, k):
-    return (k not in done) and k
-def expect(done, agenda, next, pc, c, literal):
-    if c == literal: next.add(pc - 1)
+def jump(done, agenda, next, (pc, counts), c, k):
+    return (k, counts) if (k, counts) not in done else None
+def expect(done, agenda, next, (pc, counts), c, literal):
+    if c == literal: next.add((pc - 1, counts))
     return None
-def alt(done, agenda, next, pc, c, k):
-    if k not in done: agenda.add(k)
-    return pc-1
+def alt(done, agenda, next, (pc, counts), c, k):
+    if (k, counts) not in done: agenda.add((k, counts))
+    return pc-1, counts
+def count_enter(done, agenda, next, (pc, counts), c, skip):
+    if skip is not None and (skip, counts) not in done:
+        agenda.add((skip, counts))
+    return pc-1, counts + (0,)
+def count_loop(done, agenda, next, (pc, counts), c, (m, n, body)):
+    count = counts[-1] + 1
+    if n is None or count < n:
+        # (With no upper bound, all counts >= m act alike.)
+        again = (body, counts[:-1] + (count if n else min(count, m),))
+        if again not in done: agenda.add(again)
+    return (pc-1, counts[:-1]) if m <= count else None
 
 EOF, ACCEPTED = 'EOF', -1
 
@@ -139,6 +172,15 @@ EOF, ACCEPTED = 'EOF', -1
 ## match(complicated, 'ababaxyaxz')
 #. False
 
+## insns, (start, counts) = prepare('a{2,3}b.')
+## show(insns, start)
+#.  0   expect EOF
+#.  1   expect b
+#.  2   count_loop (2, 3, 3)
+#.  3   expect a
+#.  4 * count_enter None
+#. 
+
 tests = """\
 ab.c.d.e.f.g.   1 abcdefg
 ab|*a.          0 ababababab
@@ -153,6 +195,17 @@ ab.+c.          0 c
 ab.+c.          1 abc
 ab.+c.          1 ababc
 a**x.           1 aaax
+ab.{2}          1 abab
+ab.{2}          0 ababab
+a{2,3}b.        0 ab
+a{2,3}b.        1 aaab
+a{2,3}b.        0 aaaab
+a{2,}b.         1 aaaaab
+ab|{,2}c.       1 bac
+ab|{,2}c.       1 c
+a*{3}           1 aaaa
+a{0}b.          1 b
+a{0}b.          0 ab
 """.splitlines()
 for line in tests:
     re, should_match, s = line.split()
@@ -3,6 +3,8 @@ Right-to-left top-down operator-precedence parser for regular expressions.
 (Crude grammar.)
 """
 
+from parse import bounds, expand_repeat
+
 def parse(string, maker):
     ts = list(string)
 
@@ -25,9 +27,30 @@ def parse(string, maker):
             return e
         elif chomp('*'):
             return maker.many(parse_expr(6))
+        elif chomp('}'):
+            spec = []
+            while ts and ts[-1] != '{':
+                spec.append(ts.pop())
+            if not chomp('{'): raise SyntaxError('Unmatched }')
+            m, n = bounds(''.join(reversed(spec)))
+            return parse_repeat(m, n)
         else:
             return maker.lit(ts.pop())
 
+    def parse_repeat(m, n):
+        if getattr(maker, 'repeat', None):
+            return maker.repeat(parse_expr(6), m, n)
+        # Else expand it, parsing the body afresh for each copy (since
+        # some makers, like glushkov's, want each node used just once).
+        saved, end = ts[:], len(ts)
+        tokens = []
+        def copy():
+            if tokens: ts.extend(tokens)
+            re = parse_expr(6)
+            if not tokens: tokens.extend(saved[len(ts):end])
+            return re
+        return expand_repeat(maker, copy, m, n)
+
     def chomp(token):
         matches = (ts and ts[-1] == token)
         if matches: ts.pop()
@@ -43,6 +66,7 @@ class TreeMaker:
     def alt(self, t1, t2): return 'Alt(%s, %s)' % (t1, t2)
     def seq(self, t1, t2): return 'Seq(%s, %s)' % (t1, t2)
     def many(self, t): return 'Many(%s)' % t
+    def repeat(self, t, m, n): return 'Repeat(%s, %d, %r)' % (t, m, n)
 
 maker = TreeMaker()
 
@@ -70,3 +94,12 @@ def p(s): return parse(s, maker)
 #. "Seq('a', Seq(Many('b'), 'c'))"
 ## p('()')
 #. 'empty'
+## p('ab{2,3}c')
+#. "Seq('a', Seq(Repeat('b', 2, 3), 'c'))"
+## p('(ab){2}*')
+#. "Many(Repeat(Seq('a', 'b'), 2, 2))"
+## class Expander(TreeMaker): repeat = None
+## parse('x(ab){1,2}', Expander())
+#. "Seq('x', Seq(Seq('a', 'b'), Alt(empty, Seq('a', 'b'))))"
+## parse('{0}a', Expander())
+#. "Seq(empty, 'a')"
@@ -0,0 +1,133 @@
+"""
+Grep with a pool of worker processes, using one of the matchers here.
+Usage: python pgrep.py [-c | -l] [-e engine] [-j njobs] pattern file...
+
+Like the matchers, a line matches only if the whole line matches the
+pattern (so this is more like grep -x).
+ -c: print a count of matching lines for each file
+ -l: print only the names of the files with a match
+ -e: one of %s (default lazydfa;
+     nfa_rpn_vm wants its pattern in RPN)
+ -j: how many worker processes (default: one per core)
+
+We compile the pattern once in the parent and hand the program to each
+worker as it starts. The files get split into chunks at line
+boundaries, so one big file gets spread across the workers too.
+Output comes in the same order as plain grep's. When the pattern
+requires some literal string, the workers only look at lines with it.
+"""
+
+import getopt, multiprocessing, os, sys
+
+import deriv, integrated3, lazydfa, nfa_rpn_vm, parse, parse2
+from prefilter import matching_lines, required_factor
+
+def load_deriv(pattern):
+    # (We send derivative-engine regexes as the source text, since
+    # unpickling would break the identity of deriv.fail and co.)
+    maker = deriv.Maker()
+    return parse.parse(pattern, maker)
+
+def identity(x): return x
+
+def prepare_counting(pattern):
+    return integrated3.prepare(pattern, counting=True)
+
+# Engines that take the usual infix syntax -> the parser that reads
+# it the same way, for the prefilter.
+infix_engines = {
+    'integrated3': parse2.parse,
+    'lazydfa':     parse2.parse,
+    'deriv':       parse.parse,
+}
+
+# name -> (prepare in the parent, load in the worker, run)
+engines = {
+    'integrated3': (prepare_counting, identity, integrated3.run),
+    'lazydfa':     (integrated3.prepare, lazydfa.LazyDFA, lazydfa.LazyDFA.run),
+    'nfa_rpn_vm':  (nfa_rpn_vm.prepare, identity, nfa_rpn_vm.run),
+    'deriv':       (identity, load_deriv, deriv.match),
+}
+
+chunk_size = 1 << 22
+
+def grep(engine, pattern, filenames, mode='lines', njobs=None):
+    """Yield output lines for pattern over filenames. mode is 'lines',
+    'count', or 'files' (like grep's default, -c, and -l)."""
+    prepare, load, run = engines[engine]
+    factor = ('' if engine not in infix_engines
+              else required_factor(pattern, infix_engines[engine]))
+    pool = multiprocessing.Pool(njobs, init_worker,
+                                (engine, prepare(pattern), factor))
+    try:
+        tasks = [(filename, start, end)
+                 for filename in filenames
+                 for start, end in split_lines(filename, chunk_size)]
+        results = pool.imap(grep_chunk, tasks)
+        for line in collate(results, tasks, filenames, mode):
+            yield line
+    finally:
+        pool.terminate()
+
+def collate(results, tasks, filenames, mode):
+    prefix = len(filenames) != 1
+    counts = dict((filename, 0) for filename in filenames)
+    for (filename, _, _), lines in zip(tasks, results):
+        if mode == 'lines':
+            for line in lines:
+                yield (filename + ':' if prefix else '') + line
+        elif mode == 'files':
+            if lines and not counts[filename]: yield filename
+        counts[filename] += len(lines)
+    if mode == 'count':
+        for filename in filenames:
+            count = str(counts[filename])
+            yield filename + ':' + count if prefix else count
+
+def split_lines(filename, size):
+    "Return (start, end) ranges covering the file, cut at line ends."
+    total = os.path.getsize(filename)
+    ranges, start = [], 0
+    with open(filename, 'rb') as f:
+        while start < total:
+            f.seek(min(start + size, total))
+            f.readline()        # Move to the next line boundary
+            end = min(f.tell(), total)
+            ranges.append((start, end))
+            start = end
+    return ranges or [(0, 0)]
+
+program = None                  # The compiled pattern, in a worker
+run = None
+factor = ''                     # A string every matching line contains
+
+def init_worker(engine, prepared, required):
+    global program, run, factor
+    _, load, run = engines[engine]
+    program = load(prepared)
+    factor = required
+
+def grep_chunk((filename, start, end)):
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start)
+    return list(matching_lines(lambda line: run(program, line),
+                               factor, text))
+
+def main(argv):
+    opts, args = getopt.getopt(argv[1:], 'cle:j:')
+    opts = dict(opts)
+    if len(args) < 2 or ('-c' in opts and '-l' in opts):
+        sys.stderr.write(__doc__ % ', '.join(sorted(engines)))
+        return 2
+    mode = 'count' if '-c' in opts else 'files' if '-l' in opts else 'lines'
+    njobs = int(opts['-j']) if '-j' in opts else None
+    found = False
+    for line in grep(opts.get('-e', 'lazydfa'), args[0], args[1:],
+                     mode, njobs):
+        print line
+        found = True
+    return 0 if found else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,148 @@
+"""
+Pull required literals out of a regex, so a matcher can skip over
+text that can't match using str.find (which is a Boyer-Moore-Horspool
+sort of search, in C) and only run the automaton near the hits.
+
+We analyze a regex into (exact, prefix, suffix, factor):
+ exact: the set of strings it matches, if that's small, else None
+ prefix, suffix: strings every match starts/ends with
+ factor: the longest string we found that every match contains
+Past max_length characters an exact set counts as inexact and the other
+strings get clipped, to keep common_factor's cubic search cheap.
+"""
+
+import parse
+
+max_exact = 16
+max_length = 64
+
+def required_factor(re, parser=parse.parse):
+    """Return a string every match of re must contain (maybe ''). Pass
+    the parser for the matcher's syntax, since they don't all agree."""
+    return analyze(re, parser)[3]
+
+def analyze(re, parser=parse.parse): return parser(re, PrefilterMaker())
+
+def prefiltered(is_match, re, parser=parse.parse):
+    "Wrap is_match(s) to first reject any s without re's required factor."
+    factor = required_factor(re, parser)
+    if not factor: return is_match
+    return lambda s: factor in s and is_match(s)
+
+def matching_lines(is_match, factor, text):
+    """Yield the lines of text that satisfy is_match, trying only the
+    lines that contain factor."""
+    if not factor:
+        lines = text.split('\n')
+        if lines[-1] == '': lines.pop()
+        for line in lines:
+            if is_match(line): yield line
+        return
+    i = text.find(factor)
+    while i != -1:
+        start = text.rfind('\n', 0, i) + 1
+        end = text.find('\n', i)
+        if end == -1: end = len(text)
+        line = text[start:end]
+        if is_match(line): yield line
+        i = text.find(factor, end)
+
+class PrefilterMaker:
+    empty = (frozenset(['']), '', '', '')
+
+    def lit(self, c):
+        return from_exact(frozenset([c]))
+
+    def alt(self, (x1, p1, s1, f1), (x2, p2, s2, f2)):
+        if x1 is not None and x2 is not None and len(x1 | x2) <= max_exact:
+            return from_exact(x1 | x2)
+        prefix = common_prefix([p1, p2])
+        suffix = common_prefix([s1[::-1], s2[::-1]])[::-1]
+        return inexact(prefix, suffix, [common_factor([f1, f2])])
+
+    def seq(self, (x1, p1, s1, f1), (x2, p2, s2, f2)):
+        if (x1 is not None and x2 is not None
+            and len(x1) * len(x2) <= max_exact):
+            return from_exact(frozenset(a+b for a in x1 for b in x2))
+        prefix = p1 + p2 if is_single(x1) else p1
+        suffix = s1 + s2 if is_single(x2) else s2
+        return inexact(prefix, suffix, [f1, f2, s1 + p2])
+
+    def many(self, (x, p, s, f)):
+        if x == self.empty[0]: return self.empty
+        return (None, '', '', '')
+
+def from_exact(strings):
+    prefix = common_prefix(strings)
+    suffix = common_prefix([s[::-1] for s in strings])[::-1]
+    if max_length < max(map(len, strings)):
+        return inexact(prefix, suffix, [])
+    return (strings, prefix, suffix,
+            longest([prefix, suffix, common_factor(strings)]))
+
+def inexact(prefix, suffix, factors):
+    "Make an inexact analysis, clipping its strings to max_length."
+    prefix, suffix = prefix[:max_length], suffix[-max_length:]
+    return (None, prefix, suffix,
+            longest([prefix, suffix] + [f[:max_length] for f in factors]))
+
+def is_single(exact): return exact is not None and len(exact) == 1
+
+def longest(strings): return max(strings, key=len)
+
+def common_prefix(strings):
+    strings = list(strings)
+    prefix = min(strings)
+    for s in strings:
+        while not s.startswith(prefix): prefix = prefix[:-1]
+    return prefix
+
+def common_factor(strings):
+    "Return the longest string that's a substring of every one of strings."
+    strings = sorted(strings, key=len)
+    shortest, rest = strings[0], strings[1:]
+    for n in range(len(shortest), 0, -1):
+        for i in range(len(shortest) - n + 1):
+            factor = shortest[i:i+n]
+            if all(factor in s for s in rest):
+                return factor
+    return ''
+
+## required_factor('ERROR')
+#. 'ERROR'
+## required_factor('(a|b)*ERROR: (disk|net)*')
+#. 'ERROR: '
+## required_factor('(ab|cd)*(disk full|net down)')
+#. ' '
+## required_factor('x(disk full|disk down)*y')
+#. 'x'
+## required_factor('(hello|jello)')
+#. 'ello'
+## required_factor('a*')
+#. ''
+## required_factor('(x{1000}|y{1000})z')
+#. 'z'
+## len(required_factor('ab{1000}c'))
+#. 64
+## analyze('(ab|ac)d')
+#. (frozenset(['abd', 'acd']), 'a', 'd', 'a')
+
+# parse2 (integrated3's syntax) takes an empty alternative, where
+# parse.py reads the | as a literal:
+## import parse2
+## required_factor('(|ab)c', parse2.parse), required_factor('(|ab)c')
+#. ('c', '|abc')
+## required_factor('(a|(|a))a(b|)', parse2.parse)
+#. 'a'
+## analyze('(ab|ac)d', parse2.parse)
+#. (frozenset(['abd', 'acd']), 'a', 'd', 'a')
+
+## is_match = prefiltered(lambda s: True, 'x(ab)*y')
+## is_match('xaby'), is_match('abab')
+#. (True, False)
+
+## text = 'ok\nERROR: disk\nok\nERROR: fine\nERROR: '
+## list(matching_lines(lambda line: line.endswith('disk'), 'ERROR', text))
+#. ['ERROR: disk']
+## list(matching_lines(lambda line: True, 'ERROR', text))
+#. ['ERROR: disk', 'ERROR: fine', 'ERROR: ']
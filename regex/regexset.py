@@ -0,0 +1,53 @@
+"""
+Match a string against a whole set of regexes at once: compile them
+all into one integrated3 program, each pattern ending in its own
+accepting instruction, alternated together with splits. Then one pass
+with a lazy DFA over that program tells which patterns match, with
+each DFA state labeled by the set of patterns it accepts.
+"""
+
+from integrated3 import (compile_re, emit, emit_jump, encode,
+                         op_expect, op_split)
+from lazydfa import LazyDFA
+
+class RegexSet:
+
+    def __init__(self, res, max_states=10000):
+        self.res = list(res)
+        insns = []
+        self.accepts = []       # The accepting pc for each regex
+        start = None
+        for i, re in enumerate(self.res):
+            # Expect an impossible char, distinct for each pattern:
+            insns.append(encode(op_expect, -1 - i))
+            self.accepts.append(len(insns) - 1)
+            re_start = compile_re(insns, re, len(insns) - 1)
+            start = (re_start if start is None
+                     else emit(insns, op_split, re_start, start))
+        if start is None:
+            insns.append(encode(op_expect, -1))
+        else:
+            emit_jump(insns, start)
+        self.insns = insns
+        self.dfa = LazyDFA(insns, max_states, label=self.label)
+
+    def label(self, agenda):
+        return tuple(i for i, pc in enumerate(self.accepts) if agenda.has(pc))
+
+    def matches(self, s):
+        "Return the indices of the regexes that match s, in order."
+        return self.dfa.run(s)
+
+## rs = RegexSet(['ab*', 'a(b|c)', '(a|b)*', 'c'])
+## rs.matches('ab')
+#. (0, 1, 2)
+## rs.matches('abbb')
+#. (0, 2)
+## rs.matches('')
+#. (2,)
+## rs.matches('c')
+#. (3,)
+## rs.matches('ca')
+#. ()
+## RegexSet([]).matches('x')
+#. ()
@@ -0,0 +1,194 @@
+"""
+Unanchored search with integrated3's bitset NFA, Pike-VM style: we
+start a new thread at every position, and each thread carries the
+position it started from. When two threads land on the same state,
+the one that started earlier wins -- its future is the same, and it's
+further left. We keep the threads in an ordered list as well as the
+bitset, ordered by start, so that's just first come first served. So
+this finds the leftmost-longest match in time linear in the text
+(times the pattern size), with no backtracking.
+
+A thread also carries its capture slots: a tuple with the start, the
+end (filled in at the accepting state), and the start and end of each
+group, as recorded by the op_save tags it's passed through. Among the
+threads that started at the same place, the first to reach a state is
+the one a backtracker would have tried first (see integrated3's
+captures mode), so its groups are the ones we report: leftmost-longest
+for the whole match, and backtracking order for the groups within it.
+(Except that we never go round a loop without consuming anything,
+where a backtracker may go round once.)
+"""
+
+from bisect import bisect_left
+
+from integrated3 import (prepare, decode, op_expect, op_jump, op_split,
+                         op_save, Bitset)
+
+def search(re, text, pos=0):
+    return Searcher(prepare(re, captures=True)).search(text, pos)
+
+def finditer(re, text, pos=0):
+    return Searcher(prepare(re, captures=True)).finditer(text, pos)
+
+class Searcher:
+
+    def __init__(self, insns):
+        self.insns = insns
+        saves = [arg for op, arg in map(decode, insns) if op == op_save]
+        self.ngroups = max([1] + saves) // 2
+        # The slots of an empty match at 0, if re matches the empty string:
+        agenda, slots = Bitset(len(insns)), [None] * len(insns)
+        spread(insns, len(insns) - 1, agenda, [], slots,
+               (0,) + (None,) * (1 + 2 * self.ngroups), 0, Bitset(len(insns)))
+        self.empty = slots[0] if agenda.has(0) else None
+
+    def search(self, text, pos=0):
+        """Return the leftmost-longest match in text[pos:], as a tuple
+        of the spans (start, end) of the whole match and of each group
+        (None for a group that didn't take part), or None."""
+        for found in self.finditer(text, pos):
+            return found
+        return None
+
+    def finditer(self, text, pos=0):
+        """Generate the spans of successive non-overlapping matches in
+        text[pos:], as search() does, in one pass over the text.
+
+        While the threads for one match run on, looking for a longer
+        match, we go on starting threads after its end so far, for the
+        matches after it; so we keep a chain of matches that aren't yet
+        final. The kth is matches[k], and the threads that could still
+        change it are those that started from owns[k] to its start:
+        one of them reaching the end makes it the kth match, and drops
+        the chain after it (those matches overlap it now). We yield the
+        first once its threads are all dead. When two threads land on
+        the same state, the earlier still wins: if the later could
+        reach the end, the earlier one would too, and end the match
+        the later one is part of past where the later one started."""
+        insns, n = self.insns, len(self.insns)
+        visited = Bitset(n)
+        agenda, order, slots = Bitset(n), [], [None] * n
+        next, next_order, next_slots = Bitset(n), [], [None] * n
+        unset = (None,) * (1 + 2 * self.ngroups)
+        start_pc = len(insns) - 1
+        matches, starts, owns = [], [], [pos]   # (owns[-1]: for new matches)
+        first = 0               # (matches[:first] were yielded)
+        i = pos
+        while True:
+            if agenda.has(0):   # (The accepting state is state #0)
+                found = slots[0]
+                k = bisect_left(starts, found[0], first)
+                del matches[k:], starts[k:], owns[k+1:]
+                matches.append(found[:1] + (i,) + found[2:])
+                starts.append(found[0])
+                owns.append(i)
+                # The threads that started after it are out of the running
+                # (and mustn't block new ones):
+                while slots[order[-1]][0] > found[0]:
+                    order.pop()
+                agenda.clear()
+                for pc in order: agenda.add(pc)
+                visited.clear()
+            if owns[-1] <= i:
+                spread(insns, start_pc, agenda, order, slots, (i,) + unset, i,
+                       visited)
+                if self.empty is not None:
+                    matches.append((i, i) + tuple(None if slot is None else i
+                                                  for slot in self.empty[2:]))
+                    starts.append(i)
+                    owns.append(i + 1)
+            while first < len(matches) and not (
+                    order and slots[order[0]][0] <= starts[first]):
+                yield spans(matches[first])
+                first += 1
+            if i == len(text):
+                for found in matches[first:]:
+                    yield spans(found)
+                return
+            if first == len(matches) or 64 < first < len(matches) < 2*first:
+                del matches[:first], starts[:first], owns[:first]
+                first = 0
+            c = ord(text[i])
+            i += 1
+            visited.clear()
+            for pc in order:
+                thread = slots[pc]
+                k = bisect_left(starts, thread[0], first)
+                if thread[0] < owns[k]:
+                    continue    # (Too late for one match, early for the next)
+                op, arg = decode(insns[pc])
+                if arg == c:
+                    spread(insns, pc-1, next, next_order, next_slots, thread,
+                           i, visited)
+            agenda, next = next, agenda
+            order, next_order = next_order, order
+            slots, next_slots = next_slots, slots
+            next.clear()
+            del next_order[:]
+
+def spans(slots):
+    return tuple((slots[j], slots[j+1])
+                 if slots[j] is not None and slots[j+1] is not None else None
+                 for j in range(0, len(slots), 2))
+
+def spread(insns, pc, agenda, order, slots, thread, i, visited):
+    """Like integrated3.spread, but tracking each new thread's slots.
+    i is the current position in the text."""
+    while True:
+        op, arg = decode(insns[pc])
+        if op == op_expect:
+            if not agenda.has(pc):
+                agenda.add(pc)
+                order.append(pc)
+                slots[pc] = thread
+            return
+        elif op == op_jump:
+            pc = arg
+        elif op == op_split:
+            if visited.has(pc):
+                return
+            visited.add(pc)
+            spread(insns, arg, agenda, order, slots, thread, i, visited)
+            pc -= 1
+        else:
+            assert op == op_save
+            thread = thread[:arg] + (i,) + thread[arg+1:]
+            pc -= 1
+
+## search('b', 'abc')
+#. ((1, 2),)
+## search('b', 'ac')
+## search('', 'abc')
+#. ((0, 0),)
+## search('ab*', 'xxabbbc')
+#. ((2, 6),)
+## search('ab*', 'xxabbbc', 3)
+## search('(ab|b)c', 'xabc')
+#. ((1, 4), (1, 3))
+## search('a|bcd|abcde', 'xabcdez')
+#. ((1, 6),)
+## search('a|bcd|abcde', 'xabcdez'[:5])
+#. ((1, 2),)
+## search('(a|aa)*b', 'a' * 40)
+## list(finditer('ab*', 'abbxaab'))
+#. [((0, 3),), ((4, 5),), ((5, 7),)]
+## list(finditer('x*', 'axxb'))
+#. [((0, 0),), ((1, 3),), ((3, 3),), ((4, 4),)]
+## list(finditer('a|a*b', 'aaaab'))
+#. [((0, 5),)]
+# (Searching afresh after each match would take time quadratic in n:)
+## len(list(finditer('a|a*b', 'a' * 20000)))
+#. 20000
+
+## search('(a*)(a|b)*', 'aab')
+#. ((0, 3), (0, 2), (2, 3))
+## search('(a|ab)(c|bcd)(d*)', 'abcd')
+#. ((0, 4), (0, 1), (1, 4), (4, 4))
+## search('x(a|(b))*y', 'zxabay')
+#. ((1, 6), (4, 5), (3, 4))
+## search('(a{1,2})(a*)', 'aa')
+#. ((0, 2), (0, 2), (2, 2))
+## search('(a)|b', 'b')
+#. ((0, 1), None)
+## list(finditer('(a|b)=(c*)', 'a=cc b= a=c'))
+#. [((0, 4), (0, 1), (2, 4)), ((5, 7), (5, 6), (7, 7)), ((8, 11), (8, 9), (10, 11))]
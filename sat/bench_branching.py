@@ -0,0 +1,65 @@
+"""
+Compare the decision strategies on bench_cdcl.py's problems, by
+decisions, conflicts and time, for cdclsat and for the DPLL solvers
+that take a strategy. A strategy that takes longer than the time limit
+on a problem gets skipped for the bigger ones of that kind.
+Usage: python bench_branching.py [time_limit_in_seconds]
+"""
+
+import sys, time
+sys.setrecursionlimit(10000)
+
+import cdclsat, impwatch1sat, vsids, watch1unitsat
+from bench_cdcl import problems
+
+strategies = [('static', vsids.StaticOrder),
+              ('vsids', vsids.VSIDS),
+              ('vsids/0.8', lambda variables: vsids.VSIDS(variables, 0.8))]
+
+def run_cdcl(problem, strategy):
+    solver = cdclsat.Solver(problem, strategy)
+    solver.solve()
+    return solver.decisions, solver.conflicts
+
+def counting(solve):
+    "Run solve with a strategy; return the strategy's counts."
+    def run(problem, strategy):
+        made = []
+        def make(variables):
+            made.append(strategy(variables))
+            return made[-1]
+        solve(problem, strategy=make)
+        return made[0].decisions, made[0].conflicts
+    return run
+
+solvers = [('cdclsat', run_cdcl),
+           ('watch1unitsat', counting(watch1unitsat.solve)),
+           ('impwatch1sat', counting(impwatch1sat.solve))]
+
+def main(argv):
+    limit = float(argv[1]) if 1 < len(argv) else 10
+    for solver_name, run in solvers:
+        print solver_name
+        print '%-24s' % 'problem',
+        print ' '.join('%28s' % name for name, _ in strategies)
+        print '%-24s' % '',
+        print ' '.join('%9s %9s %8s' % ('decisions', 'conflicts', 'seconds')
+                       for _ in strategies)
+        too_slow = set()
+        for name, problem in problems():
+            kind = name.rstrip('0123456789')
+            print '%-24s' % name,
+            for strategy_name, strategy in strategies:
+                if (kind, strategy_name) in too_slow:
+                    print '%28s' % '-',
+                    continue
+                start = time.time()
+                decisions, conflicts = run(problem, strategy)
+                elapsed = time.time() - start
+                print '%9d %9d %8.2f' % (decisions, conflicts, elapsed),
+                if limit < elapsed: too_slow.add((kind, strategy_name))
+            print
+        print
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,58 @@
+"""
+Time the CDCL solver against the DPLL ones on the problems/ files, on
+some N-queens problems, and on random 3-SAT problems near the hard
+ratio of 4.26 clauses per variable. A solver that takes longer than
+the time limit on a problem gets skipped for the bigger ones of that
+kind.
+Usage: python bench_cdcl.py [time_limit_in_seconds]
+"""
+
+import glob, os, random, sys, time
+sys.setrecursionlimit(10000)
+
+import cdclsat, dimacs, impwatch1sat, indexedsat, nqueens, sat, watch1unitsat
+
+solvers = [('indexedsat', indexedsat.solve),
+           ('watch1unitsat', watch1unitsat.solve),
+           ('impwatch1sat', impwatch1sat.solve),
+           ('cdclsat', cdclsat.solve)]
+
+def problems():
+    here = os.path.dirname(os.path.abspath(__file__))
+    for filename in sorted(glob.glob(os.path.join(here, 'problems', '*.dimacs'))):
+        nvariables, clauses = dimacs.load(filename)
+        yield os.path.basename(filename), clauses
+    for n in (8, 12, 14, 16):
+        yield 'queens%d' % n, nqueens.queens_problem(n)
+    for n in (20, 40, 50, 60, 100, 150, 200):
+        yield 'random3sat%d' % n, random_3sat(n, int(4.26 * n), seed=n)
+
+def random_3sat(nvariables, nclauses, seed):
+    rng = random.Random(seed)
+    return [[rng.choice((-1, 1)) * v
+             for v in rng.sample(range(1, nvariables+1), 3)]
+            for _ in range(nclauses)]
+
+def main(argv):
+    limit = float(argv[1]) if 1 < len(argv) else 10
+    print '%-24s %7s %8s' % ('problem', 'vars', 'clauses'),
+    print ' '.join('%14s' % name for name, _ in solvers)
+    too_slow = set()
+    for name, problem in problems():
+        kind = name.rstrip('0123456789')
+        print '%-24s %7d %8d' % (name, len(sat.problem_variables(problem)),
+                                 len(problem)),
+        for solver_name, solve in solvers:
+            if (kind, solver_name) in too_slow:
+                print '%14s' % '-',
+                continue
+            start = time.time()
+            env = solve(problem)
+            elapsed = time.time() - start
+            assert env is None or sat.is_satisfied(problem, env)
+            print '%13.3fs' % elapsed,
+            if limit < elapsed: too_slow.add((kind, solver_name))
+        print
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,46 @@
+"""
+Time dimacs.load against dimacs.load_flat on a random 3-SAT file, and
+load_flat on the same file gzipped and xzipped.
+Usage: python bench_dimacs.py [nclauses]
+"""
+
+import os, random, shutil, subprocess, sys, tempfile, time
+
+import dimacs
+
+def random_3sat_flat(nvariables, nclauses, seed):
+    from array import array
+    rng = random.Random(seed)
+    literals = array('i', [rng.choice((-1, 1)) * rng.randint(1, nvariables)
+                           for _ in xrange(3 * nclauses)])
+    return literals, array('i', xrange(0, 3*nclauses + 1, 3))
+
+def timed(f, *args):
+    start = time.time()
+    result = f(*args)
+    return result, time.time() - start
+
+def main(argv):
+    nclauses = int(argv[1]) if 1 < len(argv) else 200000
+    nvariables = int(nclauses / 4.26)
+    literals, offsets = random_3sat_flat(nvariables, nclauses, seed=nclauses)
+    where = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(where, 'random3sat.cnf')
+        _, elapsed = timed(dimacs.save_flat, filename, nvariables, literals, offsets)
+        print '%-24s %8.3fs (%d bytes)' % ('save_flat', elapsed,
+                                          os.path.getsize(filename))
+        (_, clauses), elapsed = timed(dimacs.load, filename)
+        print '%-24s %8.3fs' % ('load', elapsed)
+        del clauses
+        for command, extension in ((None, ''), ('gzip', '.gz'), ('xz', '.xz')):
+            if command:
+                subprocess.check_call([command, '-k', filename])
+            (_, lits, offs), elapsed = timed(dimacs.load_flat, filename + extension)
+            assert lits == literals and offs == offsets
+            print '%-24s %8.3fs' % ('load_flat' + extension, elapsed)
+    finally:
+        shutil.rmtree(where)
+
+if __name__ == '__main__':
+    main(sys.argv)
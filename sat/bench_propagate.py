@@ -0,0 +1,31 @@
+"""
+Time cdclsat's unit propagation: propagations (literals taken off the
+trail and propagated) per second, over the problems bench_cdcl.py
+uses, with the solver's decisions and conflicts for scale.
+Usage: python bench_propagate.py
+"""
+
+import sys, time
+
+import cdclsat
+from bench_cdcl import problems
+
+def main(argv):
+    print '%-24s %10s %10s %12s %12s' % ('problem', 'decisions', 'conflicts',
+                                         'propagations', 'props/sec')
+    total_props, total_time = 0, 0.0
+    for name, problem in problems():
+        solver = cdclsat.Solver(problem)
+        start = time.time()
+        solver.solve()
+        elapsed = time.time() - start
+        total_props += solver.propagations
+        total_time += elapsed
+        print '%-24s %10d %10d %12d %12.0f' % (
+            name, solver.decisions, solver.conflicts, solver.propagations,
+            solver.propagations / max(elapsed, 1e-6))
+    print '%-24s %10s %10s %12d %12.0f' % ('total', '', '', total_props,
+                                           total_props / total_time)
+
+if __name__ == '__main__':
+    main(sys.argv)
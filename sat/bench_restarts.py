@@ -0,0 +1,43 @@
+"""
+Time watch1unitsat and impwatch1sat with and without Luby restarts,
+on bench_cdcl.py's problems. A configuration that takes longer than
+the time limit on a problem gets skipped for the bigger ones of that
+kind.
+Usage: python bench_restarts.py [time_limit_in_seconds [restart_unit]]
+"""
+
+import sys, time
+sys.setrecursionlimit(10000)
+
+import impwatch1sat, sat, watch1unitsat
+from bench_cdcl import problems
+
+def main(argv):
+    limit = float(argv[1]) if 1 < len(argv) else 10
+    unit = int(argv[2]) if 2 < len(argv) else 32
+    configs = [(name + suffix, solve, options)
+               for name, solve in [('watch1unitsat', watch1unitsat.solve),
+                                   ('impwatch1sat', impwatch1sat.solve)]
+               for suffix, options in [('', {}),
+                                       ('+restarts',
+                                        dict(restart_unit=unit, seed=1))]]
+    print '%-24s' % 'problem',
+    print ' '.join('%24s' % name for name, _, _ in configs)
+    too_slow = set()
+    for name, problem in problems():
+        kind = name.rstrip('0123456789')
+        print '%-24s' % name,
+        for config, solve, options in configs:
+            if (kind, config) in too_slow:
+                print '%24s' % '-',
+                continue
+            start = time.time()
+            env = solve(problem, **options)
+            elapsed = time.time() - start
+            assert env is None or sat.is_satisfied(problem, env)
+            print '%23.3fs' % elapsed,
+            if limit < elapsed: too_slow.add((kind, config))
+        print
+
+if __name__ == '__main__':
+    main(sys.argv)
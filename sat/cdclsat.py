@@ -0,0 +1,127 @@
+"""
+Solve a SAT problem by conflict-driven clause learning. Instead of
+recursing with a fresh environment per choice, keep one assignment
+and a trail of the literals made true, in order, each tagged with its
+decision level and the clause that forced it (if any). When
+propagation falsifies a clause, walk back along the trail from the
+conflict to the first unique implication point, learn the clause
+that cut implies, and jump back to the level where it becomes unit --
+possibly undoing many decisions at once. The assignment, trail and
+clauses are watch2.py's, which also does the unit propagation; the
+choice of decisions is up to a strategy from vsids.py.
+"""
+
+## solve([])
+#. {}
+## solve([[]])
+## solve([[1]])
+#. {1: True}
+## solve([[1], [-1]])
+## solve([[1,-2], [1,2]])
+#. {1: True, 2: False}
+## solve([[1,-2], [2,-3], [1,3]])
+#. {1: True, 2: False, 3: False}
+## solve([[1, 2], [-1, 2], [1, -2], [-1, -2]])
+
+import sat
+from vsids import VSIDS
+from watch2 import Propagator, encode, no_reason
+
+def solve(problem, strategy=VSIDS):
+    """Return a satisfying assignment for problem, or None if impossible.
+    strategy(variables) makes the decision strategy."""
+    return Solver(problem, strategy).solve()
+
+class Solver(Propagator):
+
+    def __init__(self, problem, strategy=VSIDS):
+        self.variables = sat.problem_variables(problem)
+        Propagator.__init__(self, max(self.variables or [0]))
+        self.strategy = strategy(self.variables)
+        self.learned = []       # (Refs of the learned clauses)
+        self.decisions = self.conflicts = 0
+        self.ok = True
+        for clause in problem:
+            self.add_problem_clause(clause)
+
+    def add_problem_clause(self, clause):
+        clause = sorted(set(clause), key=abs)
+        if any(-literal in clause for literal in clause):
+            return              # (Always true.)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            code = encode(clause[0])
+            if self.value[code] == 0: self.assign(code, no_reason)
+            elif self.value[code] == -1: self.ok = False
+        else:
+            self.add_clause(map(encode, clause))
+
+    def solve(self):
+        if not self.ok or self.propagate() != no_reason:
+            return None
+        is_free = lambda v: self.value[2*v] == 0
+        while True:
+            literal = self.strategy.pick(is_free)
+            if literal is None:
+                return dict((v, self.value[encode(v)] == 1)
+                            for v in self.variables)
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.assign(encode(literal), no_reason)
+            while True:
+                conflict = self.propagate()
+                if conflict == no_reason: break
+                self.conflicts += 1
+                if not self.trail_lim:
+                    return None         # (A conflict at level 0.)
+                learned, level = self.analyze(conflict)
+                self.strategy.decay()
+                self.backjump(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], no_reason)
+                else:
+                    ref = self.add_clause(learned)
+                    self.learned.append(ref)
+                    self.assign(learned[0], ref)
+
+    def backjump(self, level):
+        if level < len(self.trail_lim):
+            for code in self.trail[self.trail_lim[level]:]:
+                self.strategy.unassigned(code >> 1, not code & 1)
+        Propagator.backjump(self, level)
+
+    def analyze(self, conflict):
+        """Return the first-UIP clause learned from a conflict, as literal
+        numbers: the asserting literal first, then the one of highest
+        level (so they're the right two to watch). Also return the
+        level to jump back to."""
+        level, trail = self.level, self.trail
+        current = len(self.trail_lim)
+        learned = [None]
+        seen = bytearray(len(level))
+        pending = 0             # Seen variables at the current level
+        i = len(trail)
+        ref, code = conflict, None
+        while True:
+            for other in self.clause(ref):
+                v = other >> 1
+                if other != code and not seen[v] and 0 < level[v]:
+                    seen[v] = 1
+                    self.strategy.bump(v)
+                    if level[v] == current: pending += 1
+                    else:                   learned.append(other)
+            # The latest seen literal on the trail gets resolved on next:
+            i -= 1
+            while not seen[trail[i] >> 1]:
+                i -= 1
+            code = trail[i]
+            pending -= 1
+            if pending == 0: break
+            ref = self.reason[code >> 1]
+        learned[0] = code ^ 1
+        if len(learned) == 1:
+            return learned, 0
+        top = max(range(1, len(learned)), key=lambda j: level[learned[j] >> 1])
+        learned[1], learned[top] = learned[top], learned[1]
+        return learned, level[learned[1] >> 1]
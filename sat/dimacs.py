@@ -1,7 +1,26 @@
 """
 Read or write the DIMACS CNF file format.
+
+load and save deal in lists of clauses, which is fine for small
+problems. For big ones, load_flat reads the file a chunk at a time
+and parses each chunk's numbers in one go (as JSON), into a flat array of all
+the literals plus an array of where each clause starts in it (with
+the end as the last entry); Clauses makes those look like a list of
+clauses again. The filename may end in .gz or .xz to read (or write)
+a compressed stream.
 """
 
+from array import array
+import gzip, json, subprocess
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
 def save(filename, problem):
     save_file(open(filename, 'w'), problem)
 
@@ -46,3 +65,152 @@ def load_file(f):
         clauses.append(clause)
     assert nclauses == len(clauses)
     return nvariables, clauses
+
+def open_stream(filename, mode='rb'):
+    "Open filename, decompressing (or compressing) by its extension."
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode)
+    if filename.endswith('.xz'):
+        if lzma:
+            return lzma.open(filename, mode)
+        if mode.startswith('r'):
+            return Pipe(['xz', '-dc', filename])
+        raise Exception('Writing .xz needs the lzma module')
+    return open(filename, mode)
+
+class Pipe:
+    """A command's output, to read like a file. Reading to the end
+    raises IOError if the command failed (say, on a truncated archive),
+    rather than passing off its partial output as the whole."""
+
+    def __init__(self, command):
+        self.command = command
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE)
+
+    def read(self, size=-1):
+        data = self.process.stdout.read(size)
+        if not data and size != 0:
+            self.check()
+        return data
+
+    def check(self):
+        if self.process.wait() != 0:
+            raise IOError('%s exited with status %d'
+                          % (' '.join(self.command), self.process.returncode))
+
+    def close(self):
+        self.process.stdout.close()
+        self.process.wait()
+
+def save_flat(filename, nvariables, literals, offsets):
+    f = open_stream(filename, 'wb')
+    save_flat_file(f, nvariables, literals, offsets)
+    f.close()
+
+def save_flat_file(f, nvariables, literals, offsets, batch=1 << 14):
+    nclauses = len(offsets) - 1
+    f.write('p cnf %d %d\n' % (nvariables, nclauses))
+    for i in xrange(0, nclauses, batch):
+        f.write(''.join(' '.join(map(str, clause)) + ' 0\n'
+                        for clause in Clauses(literals, offsets[i:i+batch+1])))
+
+def load_flat(filename, chunk_size=1 << 20):
+    f = open_stream(filename)
+    try:
+        return load_flat_file(f, chunk_size)
+    finally:
+        f.close()
+
+def load_flat_file(f, chunk_size=1 << 20):
+    """Return (nvariables, literals, offsets): clause i is
+    literals[offsets[i]:offsets[i+1]]."""
+    header = None
+    literals = array('i')
+    offsets = array('i', [0])
+    rest = ''
+    done = False
+    while not done:
+        chunk = f.read(chunk_size)
+        text = rest + chunk
+        if chunk:
+            end = text.rfind('\n') + 1  # (Parse whole lines only.)
+            text, rest = text[:end], text[end:]
+        else:
+            done = True
+        just_numbers = not text.translate(None, ' \t\r\n-0123456789')
+        if not just_numbers:
+            # Some lines aren't clauses.
+            lines = []
+            for line in text.splitlines():
+                if line.startswith('c'):
+                    continue
+                elif line.startswith('p'):
+                    header = line.split()
+                elif line.startswith('%'):  # (SATLIB's end of data)
+                    done = True
+                    break
+                else:
+                    lines.append(line)
+            text = '\n'.join(lines)
+        # (json parses a list of numbers several times faster than
+        # map(int, ...) can, but it's stricter: no leading 0s, say.)
+        numbers = None
+        if just_numbers:
+            try:
+                numbers = json.loads('[' + ','.join(text.split()) + ']')
+            except ValueError:
+                pass
+        if numbers is None:
+            numbers = map(int, text.split())
+        if not numbers:
+            continue
+        if header is None:
+            raise Exception('Not in DIMACS CNF format')
+        assert -int(header[2]) <= min(numbers) and max(numbers) <= int(header[2])
+        # Each 0 ends a clause; we drop the 0s, so the kth one in
+        # this chunk ends the clause before literals[base + i - k].
+        base, i, k = len(literals), 0, 0
+        try:
+            while True:
+                i = numbers.index(0, i)
+                offsets.append(base + i - k)
+                i += 1; k += 1
+        except ValueError:
+            pass
+        literals.extend(filter(None, numbers))
+    if offsets[-1] < len(literals):
+        offsets.append(len(literals))
+    if header is None or header[:2] != ['p', 'cnf'] or len(header) != 4:
+        raise Exception('Not in DIMACS CNF format')
+    assert int(header[3]) == len(offsets) - 1
+    return int(header[2]), literals, offsets
+
+class Clauses:
+    """The clauses of a flat problem as a sequence, each an array('i'),
+    for the solvers that take a list of clauses."""
+
+    def __init__(self, literals, offsets):
+        self.literals = literals
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.literals[self.offsets[i]:self.offsets[i+1]]
+
+    def __iter__(self):
+        literals, offsets = self.literals, self.offsets
+        for i in xrange(len(offsets) - 1):
+            yield literals[offsets[i]:offsets[i+1]]
+
+## import StringIO
+## nvariables, literals, offsets = load_flat_file(StringIO.StringIO('c hi\np cnf 3 3\n1 -2 0 3\n0\n-1 2 -3 0\n'), 4)
+## nvariables, literals.tolist(), offsets.tolist()
+#. (3, [1, -2, 3, -1, 2, -3], [0, 2, 3, 6])
+## [list(clause) for clause in Clauses(literals, offsets)]
+#. [[1, -2], [3], [-1, 2, -3]]
+## load_flat_file(StringIO.StringIO('p cnf 2 1\n01 -2 0\n'))[1].tolist()
+#. [1, -2]
@@ -1,6 +1,8 @@
 """
 Solve a SAT problem by pruned truth-table enumeration.
-Like watch1sat, but more imperative.
+Like watch1sat, but more imperative. Optionally, restart now and
+then, keeping nogoods learned along the way (see restarts.py), and
+branch by a decision strategy (see vsids.py) instead of in order.
 """
 
 ## solve([])
@@ -13,33 +15,72 @@ Like watch1sat, but more imperative.
 #X {1: True, 2: False, 3: False}
 ## solve([[1,-2], [1,2]])
 #. {1: True, 2: False}
+## from vsids import VSIDS
+## solve([[1,-2], [2,-3], [1,3]], strategy=VSIDS)
+#. {1: True, 2: True, 3: True}
 
+import restarts
 import sat
 from sat import assign
 
-def solve(problem):
-    "Return a satisfying assignment for problem, or None if impossible."
+def solve(problem, restart_unit=None, max_nogoods=1000, seed=None,
+          strategy=None):
+    """Return a satisfying assignment for problem, or None if impossible.
+    With a restart_unit, restart after restart_unit times the next Luby
+    number of contradictions, keeping up to max_nogoods nogoods.
+    With a strategy, branch on the variables, and try their values, in
+    the order the decision strategy strategy(variables) picks."""
+    global runs, decider
+    variables = sat.problem_variables(problem)
+    decider = strategy and strategy(variables)
+    if restart_unit is None:
+        runs = None
+        return solve_run(problem, variables)
+    runs = restarts.Runs(restart_unit, max_nogoods, seed)
+    while True:
+        try:
+            return solve_run(problem + runs.store.clauses(),
+                             runs.start(variables))
+        except restarts.Restart:
+            if decider:
+                for v, value in model.items(): decider.unassigned(v, value)
+
+def solve_run(problem, variables):
     global index, model
     index, model = {}, {}
     if not make_index(problem): return None
-    return model if solving(sat.problem_variables(problem)) else None
+    return model if solving(variables) else None
 
 def solving(variables):
     "Try to extend a consistent assignment for problem to a satisfying one."
-    if not variables:
-        return True
-    v, variables = variables[0], variables[1:]
-    if update(v, False):
-        if solving(variables): return True
-    if update(v, True):
-        if solving(variables): return True
-        del model[v]
+    if decider is None:
+        if not variables:
+            return True
+        v, variables = variables[0], variables[1:]
+        values = runs.values(v) if runs else (False, True)
+    else:
+        literal = decider.pick(lambda v: v not in model)
+        if literal is None:
+            return True
+        v, values = abs(literal), (0 < literal, literal < 0)
+    decision = [None, False]    # (See Runs.path.)
+    if runs: runs.path.append(decision)
+    for value in values:
+        decision[0] = v if value else -v
+        if update(v, value):
+            if solving(variables): return True
+            del model[v]
+            if decider: decider.unassigned(v, value)
+        decision[1] = True
+    if runs: runs.path.pop()
     return False
 
 # Inv: each nonempty clause in problem is indexed under exactly one of
 # its literals. That literal is either True or unknown in model.
 index = None
 model = None
+runs = None                     # A restarts.Runs, if restarting
+decider = None                  # A decision strategy, if any
 
 def make_index(problem):
     for clause in problem:
@@ -63,5 +104,11 @@ def update(v, value):
                 break
         else:
             del model[v]
+            restarts.used(clause)
+            if decider:
+                for literal in clause: decider.bump(abs(literal))
+                decider.decay()
+                decider.unassigned(v, 0 < new_literal)
+            if runs: runs.contradiction()
             return False
     return True
@@ -0,0 +1,106 @@
+"""
+Restarts for the recursive DPLL solvers. A run gets a budget of
+contradictions -- unit times the next number of the Luby sequence
+1 1 2 1 1 2 4 1 1 2 1 1 2 4 8 ... -- and when it's used up we raise
+Restart to unwind the recursion and start over, with the variables
+shuffled and a random phase (which value to try first) for each.
+
+So the next run doesn't redo the last one's work, we keep what it
+proved: for each decision on the path where the first value tried
+had been refuted, the decisions before it plus that value make a
+nogood. Nogoods go in a store of bounded size, as extra clauses for
+later runs; when it's full we evict the one that's longest for how
+often it's been used (made a clause unit, or contradicted).
+"""
+
+import random
+
+class Restart(Exception): pass
+
+def luby(i):
+    "The i'th number (from 1) of the Luby sequence."
+    while True:
+        k = i.bit_length()
+        if i == (1 << k) - 1:
+            return 1 << (k-1)
+        i -= (1 << (k-1)) - 1
+
+## [luby(i) for i in range(1, 16)]
+#. [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+class Nogood(list):
+    "A clause, with a count of how often it's been used."
+    uses = 0
+
+def used(clause):
+    "Note that the solver got some use out of clause."
+    if type(clause) is Nogood: clause.uses += 1
+
+class NogoodStore:
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.nogoods = {}       # frozenset of literals -> Nogood
+
+    def __len__(self): return len(self.nogoods)
+
+    def add(self, literals):
+        key = frozenset(literals)
+        if key in self.nogoods or self.capacity <= 0: return
+        self.nogoods[key] = Nogood(sorted(key, key=abs))
+        if self.capacity < len(self.nogoods):
+            worst = max(self.nogoods,
+                        key=lambda k: len(k) / (1.0 + self.nogoods[k].uses))
+            del self.nogoods[worst]
+
+    def clauses(self):
+        return self.nogoods.values()
+
+class Runs:
+    """The state of a solver's sequence of runs between restarts: the
+    budget, the decision path, the nogoods, and the random choices."""
+
+    def __init__(self, unit, max_nogoods, seed=None):
+        self.unit = unit
+        self.store = NogoodStore(max_nogoods)
+        self.random = random.Random(seed)
+        self.restarts = 0
+        self.path = []          # [decision literal, whether it's the 2nd try]
+
+    def start(self, variables):
+        """Begin a run; return the variables in a random order. (Call
+        after catching Restart, too.)"""
+        self.budget = self.unit * luby(self.restarts + 1)
+        self.contradictions = 0
+        self.phase = dict((v, self.random.random() < .5) for v in variables)
+        variables = list(variables)
+        self.random.shuffle(variables)
+        return variables
+
+    def values(self, v):
+        "The values to try for v, in order."
+        return (True, False) if self.phase[v] else (False, True)
+
+    def contradiction(self):
+        self.contradictions += 1
+        if self.budget <= self.contradictions:
+            self.record_path()
+            self.restarts += 1
+            raise Restart()
+
+    def record_path(self):
+        for i, (literal, second) in enumerate(self.path):
+            if second:
+                self.store.add([-d for d, _ in self.path[:i]] + [literal])
+        del self.path[:]
+
+## store = NogoodStore(2)
+## store.add([1, -2, 3]); store.add([-4])
+## store.nogoods[frozenset([1, -2, 3])].uses = 5
+## store.add([2, 5])
+## sorted(store.clauses())
+#. [[-4], [1, -2, 3]]
+## store.nogoods[frozenset([1, -2, 3])].uses = 0
+## store.add([2, 5])
+## sorted(store.clauses())
+#. [[-4], [2, 5]]
@@ -0,0 +1,158 @@
+"""
+Decision strategies: which variable to branch on next, and which way.
+A strategy has
+
+    pick(is_free)       -- return a literal to make true, for some
+                           variable v with is_free(v), or None if none
+    bump(v)             -- v took part in a conflict
+    decay()             -- called once per conflict, after the bumps
+    unassigned(v, value) -- v, which had value, is free again
+
+and counts its decisions (the literals it picked) and conflicts (the
+calls to decay()), to compare strategies by.
+
+StaticOrder is what the solvers here did before: the lowest free
+variable, False first. VSIDS (in the exponential form of MiniSat,
+'EVSIDS') keeps an activity per variable, bumped when the variable
+takes part in a conflict, with the bump growing by 1/decay every
+conflict, so that older bumps fade; it branches on the most active
+free variable, kept in a binary max-heap indexed by variable. Phase
+saving: it tries each variable the way it was last assigned.
+
+cdclsat, watch1unitsat and impwatch1sat take a strategy to branch by.
+"""
+
+from array import array
+
+class StaticOrder:
+
+    def __init__(self, variables):
+        self.variables = sorted(variables)
+        self.decisions = self.conflicts = 0
+
+    def pick(self, is_free):
+        for v in self.variables:
+            if is_free(v):
+                self.decisions += 1
+                return -v
+        return None
+
+    def bump(self, v): pass
+    def decay(self): self.conflicts += 1
+    def unassigned(self, v, value): pass
+
+class VSIDS:
+
+    def __init__(self, variables, decay=0.95):
+        n = max(variables or [0]) + 1
+        self.activity = [0.0] * n
+        self.increment = 1.0
+        self.decay_factor = decay
+        self.phase = array('b', [0]) * n    # variable -> 1 if last True
+        self.heap = Heap(self.activity, n)
+        for v in sorted(variables):
+            self.heap.insert(v)
+        self.decisions = self.conflicts = 0
+
+    def pick(self, is_free):
+        heap = self.heap
+        while heap:
+            v = heap.pop()
+            if is_free(v):
+                self.decisions += 1
+                return v if self.phase[v] else -v
+        return None
+
+    def bump(self, v):
+        self.activity[v] += self.increment
+        if 1e100 < self.activity[v]:
+            self.rescale()
+        if v in self.heap:
+            self.heap.increased(v)
+
+    def decay(self):
+        self.conflicts += 1
+        self.increment /= self.decay_factor
+
+    def rescale(self):
+        # (Scaling everything alike keeps the heap in order.)
+        for v in range(len(self.activity)):
+            self.activity[v] *= 1e-100
+        self.increment *= 1e-100
+
+    def unassigned(self, v, value):
+        self.phase[v] = value
+        if v not in self.heap:
+            self.heap.insert(v)
+
+class Heap:
+    """A binary max-heap of variables, ordered by activity (ties going
+    to the lower variable), that knows where each variable is in it."""
+
+    def __init__(self, activity, n):
+        self.activity = activity
+        self.items = []
+        self.position = array('i', [-1]) * n    # variable -> index or -1
+
+    def __len__(self): return len(self.items)
+
+    def __contains__(self, v): return 0 <= self.position[v]
+
+    def above(self, u, v):
+        au, av = self.activity[u], self.activity[v]
+        return av < au or (au == av and u < v)
+
+    def insert(self, v):
+        self.position[v] = len(self.items)
+        self.items.append(v)
+        self.sift_up(len(self.items) - 1)
+
+    def increased(self, v):
+        self.sift_up(self.position[v])
+
+    def pop(self):
+        items = self.items
+        top, last = items[0], items.pop()
+        self.position[top] = -1
+        if items:
+            items[0] = last
+            self.position[last] = 0
+            self.sift_down(0)
+        return top
+
+    def sift_up(self, i):
+        items, position = self.items, self.position
+        v = items[i]
+        while 0 < i:
+            parent = (i - 1) >> 1
+            if not self.above(v, items[parent]): break
+            items[i] = items[parent]
+            position[items[i]] = i
+            i = parent
+        items[i] = v
+        position[v] = i
+
+    def sift_down(self, i):
+        items, position = self.items, self.position
+        v, n = items[i], len(items)
+        while True:
+            child = 2*i + 1
+            if n <= child: break
+            if child + 1 < n and self.above(items[child+1], items[child]):
+                child += 1
+            if not self.above(items[child], v): break
+            items[i] = items[child]
+            position[items[i]] = i
+            i = child
+        items[i] = v
+        position[v] = i
+
+## s = VSIDS([1, 2, 3, 4])
+## s.pick(lambda v: True), s.pick(lambda v: v != 2)
+#. (-1, -3)
+## s.unassigned(1, True); s.unassigned(3, False)
+## s.bump(4); s.decay(); s.bump(3)
+## [s.pick(lambda v: True) for _ in range(4)]
+#. [-3, -4, 1, None]
+## StaticOrder([3, 1, 2]).pick(lambda v: v != 1)
+#. -2
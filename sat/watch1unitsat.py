@@ -1,7 +1,10 @@
 """
 Solve a SAT problem by pruned truth-table enumeration. Index clauses
 by a single watched literal, to cheaply detect contradiction. When we
-notice a unit clause along the way, we take advantage.
+notice a unit clause along the way, we take advantage. Optionally,
+restart now and then, keeping nogoods learned along the way (see
+restarts.py), and branch by a decision strategy (see vsids.py)
+instead of in order.
 """
 
 ## solve([])
@@ -14,38 +17,85 @@ notice a unit clause along the way, we take advantage.
 #. {1: True, 2: False}
 ## solve([[1,-2], [2,-3], [1,3]])
 #. {1: True, 2: False, 3: False}
+## from vsids import VSIDS
+## solve([[1,-2], [2,-3], [1,3]], strategy=VSIDS)
+#. {1: True, 2: False, 3: False}
 
+import restarts
 import sat
 from sat import assign
 
-def solve(problem):
-    "Return a satisfying assignment for problem, or None if impossible."
+def solve(problem, restart_unit=None, max_nogoods=1000, seed=None,
+          strategy=None):
+    """Return a satisfying assignment for problem, or None if impossible.
+    With a restart_unit, restart after restart_unit times the next Luby
+    number of contradictions, keeping up to max_nogoods nogoods.
+    With a strategy, branch on the variables, and try their values, in
+    the order the decision strategy strategy(variables) picks."""
+    variables = sat.problem_variables(problem)
+    decider = strategy and strategy(variables)
+    if restart_unit is None:
+        return solve_run(problem, variables, None, decider)
+    runs = restarts.Runs(restart_unit, max_nogoods, seed)
+    while True:
+        try:
+            return solve_run(problem + runs.store.clauses(),
+                             runs.start(variables), runs, decider)
+        except restarts.Restart:
+            pass
+
+def solve_run(problem, variables, runs, decider=None):
     index, unit_literals = build_index(problem)
     if index == 'contradiction': return None
-    return solving(index, {}, sat.problem_variables(problem), unit_literals)
+    if decider: variables = None    # (The decider keeps track instead.)
+    return solving(index, {}, variables, unit_literals, runs, decider)
 
-def solving(index, env, variables, unit_literals):
+def solving(index, env, variables, unit_literals, runs=None, decider=None):
     "Try to extend a consistent assignment for problem to a satisfying one."
     if unit_literals == 'contradiction':
+        if runs: runs.contradiction()
         return None
-    if not variables:
+    if decider is None and not variables:
         return env
     if unit_literals:
         literal, unit_literals = unit_literals[0], unit_literals[1:]
         v, value = abs(literal), (0 < literal)
-        variables = removed(variables, v)
-        return assume(index, env, variables, unit_literals, v, value)
-    v, variables = variables[0], variables[1:]
-    for value in (False, True):
-        result = assume(index, env, variables, unit_literals, v, value)
+        if decider is None: variables = removed(variables, v)
+        return assume(index, env, variables, unit_literals, v, value, runs,
+                      decider)
+    if decider is None:
+        v, variables = variables[0], variables[1:]
+        values = runs.values(v) if runs else (False, True)
+    else:
+        literal = decider.pick(lambda v: v not in env)
+        if literal is None:
+            return env
+        v, values = abs(literal), (0 < literal, literal < 0)
+    decision = [None, False]    # (See Runs.path.)
+    if runs: runs.path.append(decision)
+    for value in values:
+        decision[0] = v if value else -v
+        result = assume(index, env, variables, unit_literals, v, value, runs,
+                        decider)
         if result is not None:
             return result
+        decision[1] = True
+    if runs: runs.path.pop()
     return None
 
-def assume(index, env, variables, unit_literals, v, value):
+def assume(index, env, variables, unit_literals, v, value, runs=None,
+           decider=None):
     env = assign(v, value, env)
-    return solving(index, env, variables,
-                   on_update(index, v if value else -v, env, unit_literals))
+    result = None
+    try:
+        result = solving(index, env, variables,
+                         on_update(index, v if value else -v, env,
+                                   unit_literals, decider),
+                         runs, decider)
+        return result
+    finally:
+        # (Even if a Restart is unwinding the stack.)
+        if result is None and decider: decider.unassigned(v, value)
 
 def build_index(problem):
     index, unit_literals = {}, []
@@ -56,7 +106,7 @@ def build_index(problem):
             unit_literals.extend(clause)
     return index, unit_literals
 
-def on_update(index, literal, env, unit_literals):
+def on_update(index, literal, env, unit_literals, decider=None):
     clauses = index.get(literal, ())
     unit_literals = unit_literals[:]
     for clause in clauses[:]:
@@ -71,7 +121,12 @@ def on_update(index, literal, env, unit_literals):
                 break                  # Clause is true
         else:
             if not unknown_literals:
+                restarts.used(clause)
+                if decider:
+                    for literal in clause: decider.bump(abs(literal))
+                    decider.decay()
                 return 'contradiction' # Clause is false
+            if len(unknown_literals) == 1: restarts.used(clause)
             clauses.remove(clause)
             watch(index, clause, unknown_literals[0])
             if (len(unknown_literals) == 1
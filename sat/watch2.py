@@ -0,0 +1,127 @@
+"""
+Unit propagation with two watched literals per clause, over flat
+arrays. Literals get numbered 2v for v and 2v+1 for -v, so a literal's
+complement is its number ^ 1, and the assignment, and the watch lists,
+are indexed by literal number. All the clauses (of 2 or more literals)
+live end to end in one array, the arena: a clause is referred to by
+the offset of its first literal, with its length just before it.
+Its first two literals are the watched ones.
+
+Each clause is on the watch lists of its two watched literals. While
+neither is false, the clause can't be unit or false, so we needn't
+look at it. When one becomes false we look for an unwatched literal
+that isn't false to watch instead; failing that, the clause is unit
+(or, if the other watched literal is false too, false). Backtracking
+needs no changes to the watches.
+"""
+
+from array import array
+
+def encode(literal):
+    "The number of a literal in sat.py's form."
+    return 2*literal if 0 < literal else 1 - 2*literal
+
+def decode(code):
+    return -(code >> 1) if code & 1 else code >> 1
+
+no_reason = -1
+
+class Propagator:
+
+    def __init__(self, nvariables):
+        n = nvariables + 1
+        self.arena = array('i')
+        self.watches = [[] for _ in range(2*n)] # literal -> clause refs
+        self.value = array('b', [0]) * (2*n)   # literal -> 1 true, -1 false
+        self.level = array('i', [0]) * n        # variable -> decision level
+        self.reason = array('i', [no_reason]) * n # variable -> clause ref
+        self.trail = array('i')                 # true literals, in order
+        self.trail_lim = []                     # level -> where it starts
+        self.queue_head = 0                     # trail[queue_head:] to do
+        self.propagations = 0
+
+    def add_clause(self, codes):
+        """Add a clause of 2 or more literal numbers, watching its first
+        two; return its ref."""
+        assert 2 <= len(codes)
+        self.arena.append(len(codes))
+        ref = len(self.arena)
+        self.arena.extend(codes)
+        self.watches[codes[0]].append(ref)
+        self.watches[codes[1]].append(ref)
+        return ref
+
+    def clause(self, ref):
+        return self.arena[ref:ref + self.arena[ref-1]]
+
+    def assign(self, code, reason):
+        "Make literal number code true. It must be unassigned."
+        self.value[code] = 1
+        self.value[code ^ 1] = -1
+        self.level[code >> 1] = len(self.trail_lim)
+        self.reason[code >> 1] = reason
+        self.trail.append(code)
+
+    def propagate(self):
+        """Assign the literals that unit clauses force. Return the ref of
+        a false clause, or no_reason if none."""
+        arena, value, watches = self.arena, self.value, self.watches
+        trail = self.trail
+        while self.queue_head < len(trail):
+            false_code = trail[self.queue_head] ^ 1
+            self.queue_head += 1
+            self.propagations += 1
+            refs = watches[false_code]
+            i = j = 0           # (Keep refs[:j], look at refs[i])
+            while i < len(refs):
+                ref = refs[i]
+                i += 1
+                # Make the false literal the clause's second:
+                other = arena[ref]
+                if other == false_code:
+                    other = arena[ref+1]
+                    arena[ref], arena[ref+1] = other, false_code
+                if value[other] == 1:
+                    refs[j] = ref; j += 1
+                    continue            # Clause is true
+                for k in xrange(ref+2, ref + arena[ref-1]):
+                    if value[arena[k]] != -1:
+                        new = arena[k]
+                        arena[ref+1], arena[k] = new, false_code
+                        watches[new].append(ref)
+                        break
+                else:
+                    refs[j] = ref; j += 1
+                    if value[other] == -1:      # Clause is false
+                        while i < len(refs):
+                            refs[j] = refs[i]; i += 1; j += 1
+                        del refs[j:]
+                        return ref
+                    self.assign(other, ref)     # Clause is unit
+            del refs[j:]
+        return no_reason
+
+    def backjump(self, level):
+        "Undo the assignments above the given decision level."
+        if level < len(self.trail_lim):
+            start = self.trail_lim[level]
+            value = self.value
+            for code in self.trail[start:]:
+                value[code] = value[code ^ 1] = 0
+            del self.trail[start:]
+            del self.trail_lim[level:]
+            self.queue_head = start
+
+## p = Propagator(3)
+## refs = [p.add_clause(map(encode, clause)) for clause in [[1, 2, 3], [-1, 2], [-2, -3]]]
+## p.trail_lim.append(len(p.trail)); p.assign(encode(1), no_reason)
+## p.propagate() == no_reason, map(decode, p.trail)
+#. (True, [1, 2, -3])
+## p.backjump(0)
+## p.trail_lim.append(len(p.trail)); p.assign(encode(-2), no_reason)
+## p.propagate() == no_reason, map(decode, p.trail)
+#. (True, [-2, -1, 3])
+## p.backjump(0)
+## p.trail_lim.append(len(p.trail)); p.assign(encode(3), no_reason); p.assign(encode(1), no_reason)
+## map(decode, p.clause(p.propagate()))
+#. [2, -1]